@@ -0,0 +1,81 @@
+"""Compares the batched indicator evaluation with evaluating the stock_market indicators
+one series at a time, and checks that both give identical values.
+
+Usage: python benchmarks/batched_indicators.py
+"""
+
+import timeit
+
+import numpy as np
+import pandas as pd
+from stock_market.core import TimeSeries
+from stock_market.ext.indicator import ExponentialMovingAverage, Identity, MovingAverage
+
+from stock_market_visualizer.app.batched_indicators import evaluate_indicators
+
+TRADING_DAYS_PER_YEAR = 252
+NOF_TICKERS = 15
+INDICATORS = [
+    ExponentialMovingAverage(5),
+    ExponentialMovingAverage(20),
+    MovingAverage(50),
+    MovingAverage(200),
+    Identity(),
+]
+REPEATS = 3
+
+
+def create_requests(years):
+    dates = pd.bdate_range("1990-01-01", periods=years * TRADING_DAYS_PER_YEAR)
+    dates = dates.to_numpy().astype("datetime64[D]")
+    rng = np.random.default_rng(0)
+    requests = []
+    for i in range(NOF_TICKERS):
+        # Every third ticker starts later, so not all series share their dates
+        start = (i % 3 == 2) * TRADING_DAYS_PER_YEAR // 2
+        values = 100 + rng.standard_normal(len(dates)).cumsum()
+        requests.extend(
+            (indicator, f"T{i}", dates[start:], values[start:])
+            for indicator in INDICATORS
+        )
+    return requests
+
+
+def evaluate_separately(requests):
+    return [
+        indicator(
+            TimeSeries(name, pd.DataFrame({"date": dates, "value": values}))
+        ).values.to_numpy()
+        for indicator, name, dates, values in requests
+    ]
+
+
+def time_evaluation(evaluate, requests):
+    """Returns the best evaluation time in milliseconds"""
+    return 1000 * min(
+        timeit.repeat(lambda: evaluate(requests), number=1, repeat=REPEATS)
+    )
+
+
+def main():
+    print(
+        f"{'years':>5} {'series':>7} {'separate':>10} {'batched':>10} {'identical':>10}"
+    )
+    for years in [1, 10, 30]:
+        requests = create_requests(years)
+        identical = all(
+            np.array_equal(separate, batched)
+            for separate, batched in zip(
+                evaluate_separately(requests), evaluate_indicators(requests)
+            )
+        )
+        print(
+            f"{years:>5} {len(requests):>7}"
+            f" {time_evaluation(evaluate_separately, requests):>8.1f}ms"
+            f" {time_evaluation(evaluate_indicators, requests):>8.1f}ms"
+            f" {str(identical):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
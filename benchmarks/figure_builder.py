@@ -0,0 +1,87 @@
+"""Compares building the graph figure as a plain dict with building it with plotly
+graph objects, and checks that both give the same figure json.
+
+Usage: python benchmarks/figure_builder.py
+"""
+
+import json
+import timeit
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from stock_market_visualizer.app.figure_builder import (
+    FigureBuilder,
+    GraphObjectsFigureBuilder,
+)
+
+NOF_POINTS = 2000
+NOF_MARKERS = 20
+REPEATS = 5
+
+
+def create_lines(nof_lines):
+    dates = pd.bdate_range("2000-01-01", periods=NOF_POINTS).to_numpy("datetime64[D]")
+    rng = np.random.default_rng(0)
+    return [
+        ([f"T{i}", None, None], f"T{i}", dates, rng.standard_normal(NOF_POINTS))
+        for i in range(nof_lines)
+    ]
+
+
+def create_plain_builder():
+    # Typed arrays are compared in benchmarks/figure_serialization.py
+    return FigureBuilder(typed_arrays=False)
+
+
+def build(create_builder, lines):
+    figure = create_builder()
+    figure.add_lines(lines, "scatter")
+    figure.set_relative()
+    for _, name, dates, values in lines:
+        figure.add_markers(
+            f"Signal ({name})",
+            list(dates[:: NOF_POINTS // NOF_MARKERS].astype(object)),
+            values[:: NOF_POINTS // NOF_MARKERS],
+            dict(symbol="triangle-up", size=12, color="green"),
+        )
+    figure.add_signal_row()
+    figure.add_markers(
+        "Monthly",
+        list(lines[0][2][::100].astype(object)),
+        [0] * len(lines[0][2][::100]),
+        dict(symbol="circle", color="gray"),
+        in_signal_row=True,
+    )
+    return figure.build()
+
+
+def time_build(create_builder, lines):
+    """Returns the best build and serialization time in milliseconds"""
+    return 1000 * min(
+        timeit.repeat(
+            lambda: pio.to_json(build(create_builder, lines), validate=False),
+            number=1,
+            repeat=REPEATS,
+        )
+    )
+
+
+def main():
+    print(f"{'lines':>5} {'graph objects':>14} {'dict':>10} {'same json':>10}")
+    for nof_lines in [5, 20, 50]:
+        lines = create_lines(nof_lines)
+        same = json.loads(
+            pio.to_json(build(GraphObjectsFigureBuilder, lines), validate=False)
+        ) == json.loads(pio.to_json(build(create_plain_builder, lines), validate=False))
+        print(
+            f"{nof_lines:>5}"
+            f" {time_build(GraphObjectsFigureBuilder, lines):>12.1f}ms"
+            f" {time_build(create_plain_builder, lines):>8.1f}ms"
+            f" {str(same):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
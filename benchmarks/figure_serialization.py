@@ -0,0 +1,92 @@
+"""Compares the size and the serialization time of the graph figure with its lines as
+json lists and as typed arrays, and checks that the typed arrays decode to the lines.
+
+Usage: python benchmarks/figure_serialization.py
+"""
+
+import timeit
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from stock_market_visualizer.app.figure_builder import FigureBuilder
+from stock_market_visualizer.app.typed_array import decode
+
+NOF_TICKERS = 10
+INDICATORS_PER_TICKER = 2
+REPEATS = 5
+
+
+def create_lines(nof_points):
+    dates = pd.bdate_range("1995-01-01", periods=nof_points).to_numpy("datetime64[D]")
+    rng = np.random.default_rng(0)
+    return [
+        (
+            [f"T{i}", None, None],
+            f"T{i} {j}",
+            dates,
+            rng.standard_normal(nof_points).cumsum() / 100,
+        )
+        for i in range(NOF_TICKERS)
+        for j in range(1 + INDICATORS_PER_TICKER)
+    ]
+
+
+def serialize(lines, typed_arrays, engine):
+    figure = FigureBuilder(typed_arrays)
+    figure.add_lines(lines, "scattergl")
+    figure.set_relative()
+    return pio.to_json(figure.build(), validate=False, engine=engine)
+
+
+def time_serialize(lines, typed_arrays, engine):
+    """Returns the best build and serialization time in milliseconds"""
+    return 1000 * min(
+        timeit.repeat(
+            lambda: serialize(lines, typed_arrays, engine), number=1, repeat=REPEATS
+        )
+    )
+
+
+def decodes_to_lines(lines):
+    figure = FigureBuilder()
+    figure.add_lines(lines, "scattergl")
+    return all(
+        np.array_equal(decode(trace["x"]), dates)
+        and np.allclose(decode(trace["y"]), values, rtol=1e-6)
+        for trace, (_, _, dates, values) in zip(figure.build()["data"], lines)
+    )
+
+
+def main():
+    variants = [(False, "json"), (False, "orjson"), (True, "orjson")]
+    print(f"{len(create_lines(1))} lines")
+    print(
+        f"{'points':>7} "
+        + " ".join(
+            f"{('typed' if typed else 'lists') + ' ' + engine:>22}"
+            for typed, engine in variants
+        )
+        + f" {'decodes':>8}"
+    )
+    # The graph downsamples the visible part of the lines to its width in pixels,
+    # a zoom on a few years shows all of their points
+    for nof_points in [1000, 1920, 7500]:
+        lines = create_lines(nof_points)
+        results = [
+            (
+                len(serialize(lines, typed, engine)) / 1e6,
+                time_serialize(lines, typed, engine),
+            )
+            for typed, engine in variants
+        ]
+        print(
+            f"{nof_points:>7} "
+            + " ".join(f"{size:>10.2f}MB {time:>7.1f}ms" for size, time in results)
+            + f" {str(decodes_to_lines(lines)):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Compares the size and parse time of the json and columnar msgpack ohlc encodings.
+
+Usage: python benchmarks/ohlc_transport.py
+"""
+
+import json
+import timeit
+
+import numpy as np
+import pandas as pd
+from stock_market.core import OHLC
+
+from stock_market_visualizer.app.columnar_ohlc import ColumnarOHLC
+
+TRADING_DAYS_PER_YEAR = 252
+REPEATS = 5
+
+
+def create_ohlc(years):
+    dates = pd.Series(
+        pd.bdate_range("1990-01-01", periods=years * TRADING_DAYS_PER_YEAR)
+    )
+    close = pd.Series(
+        100 + np.random.default_rng(0).standard_normal(len(dates)).cumsum()
+    )
+    return OHLC(dates, close, close + 1, close - 1, close)
+
+
+def time_parse(parse, payload):
+    """Returns the best parse time in milliseconds"""
+    return 1000 * min(timeit.repeat(lambda: parse(payload), number=1, repeat=REPEATS))
+
+
+def main():
+    print(
+        f"{'years':>5} {'json bytes':>12} {'msgpack bytes':>14} {'OHLC.from_json':>15}"
+        f" {'columnar json':>14} {'msgpack':>10}"
+    )
+    for years in [1, 10, 30]:
+        ohlc_json = create_ohlc(years).to_json()
+        json_payload = json.dumps(ohlc_json).encode()
+        msgpack_payload = ColumnarOHLC.from_json(ohlc_json).to_msgpack()
+        print(
+            f"{years:>5} {len(json_payload):>12} {len(msgpack_payload):>14}"
+            f" {time_parse(OHLC.from_json, ohlc_json):>13.3f}ms"
+            f" {time_parse(ColumnarOHLC.from_json, ohlc_json):>12.3f}ms"
+            f" {time_parse(ColumnarOHLC.from_msgpack, msgpack_payload):>8.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
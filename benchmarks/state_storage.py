@@ -0,0 +1,110 @@
+"""Compares the redis memory of restoreable states stored as json under uuid4 ids and
+as compressed msgpack under content hashes, and how many keys repeated stores of the
+same dashboard create.
+
+Measures the MEMORY USAGE of the keys in the redis of the settings (REDIS_URL), and
+the sizes of the keys and values if that redis is not reachable.
+
+Usage: python benchmarks/state_storage.py
+"""
+
+import json
+import uuid
+
+import redis
+
+from stock_market_visualizer.app.config_store import ConfigStore, decode_state
+from stock_market_visualizer.app.redis_helper import init_redis_pool
+from stock_market_visualizer.app.storage import RedisStorage
+
+NOF_STATES = 100
+NOF_SHARES = 20
+
+
+def create_state(i, nof_tickers):
+    indicators = [
+        {
+            "ticker-col": f"T{i}-{j}",
+            "indicator": {"name": name, "config": config},
+            "indicator-col": f"{name} {config}",
+        }
+        for j in range(nof_tickers)
+        for name, config in [("SMA", [50]), ("SMA", [200]), ("BB", [20, 2])]
+    ]
+    return {
+        "header-title": f"Dashboard {i}",
+        "engine-id": str(uuid.uuid4()),
+        "start-date": "2015-01-01",
+        "end-date": "2024-06-28",
+        "indicators": indicators,
+        "show-ticker-table": [True],
+        "show-indicator-table": [True],
+        "show-signal-table": [],
+    }
+
+
+def store_state(config_store, state):
+    return config_store.store_state(*state.values())
+
+
+def get_memory(r, keys):
+    try:
+        return sum(r.memory_usage(key) for key in keys), "memory usage"
+    except redis.exceptions.RedisError:
+        return (
+            sum(len(key) + len(r.get(key)) for key in keys),
+            "key and value bytes",
+        )
+
+
+def measure(r, nof_tickers):
+    states = [create_state(i, nof_tickers) for i in range(NOF_STATES)]
+    json_keys = []
+    for state in states:
+        key = str(uuid.uuid4())
+        r.set(key, json.dumps(state))
+        json_keys.append(key)
+    config_store = ConfigStore(RedisStorage(r))
+    hashed_keys = [store_state(config_store, state) for state in states]
+    assert config_store.load_states(hashed_keys) == states
+    assert decode_state(r.get(json_keys[0])) == states[0]
+    try:
+        json_memory, unit = get_memory(r, json_keys)
+        hashed_memory, _ = get_memory(r, hashed_keys)
+    finally:
+        r.delete(*json_keys, *hashed_keys)
+    return json_memory / NOF_STATES, hashed_memory / NOF_STATES, unit
+
+
+def count_shared_keys(r):
+    """The number of keys after sharing the same dashboard NOF_SHARES times"""
+    state = create_state(0, 3)
+    state_ids = {
+        store_state(ConfigStore(RedisStorage(r)), state) for _ in range(NOF_SHARES)
+    }
+    r.delete(*state_ids)
+    return len(state_ids)
+
+
+def main():
+    r = init_redis_pool(decode_responses=False)
+    try:
+        r.ping()
+    except redis.exceptions.ConnectionError:
+        import fakeredis
+
+        r = fakeredis.FakeRedis()
+
+    print(f"{'tickers':>7} {'json + uuid4':>13} {'msgpack + hash':>15}")
+    for nof_tickers in [1, 5, 20]:
+        json_memory, hashed_memory, unit = measure(r, nof_tickers)
+        print(f"{nof_tickers:>7} {json_memory:>13.0f} {hashed_memory:>15.0f}")
+    print(f"(bytes per stored state, {unit})")
+    print(
+        f"{NOF_SHARES} stores of the same dashboard: {NOF_SHARES} uuid4 keys before,"
+        f" {count_shared_keys(r)} key now"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compares the latency of the storage operations of a page load, reading a state
+and recording its view in one batch, and of storing a state, with the redis and the
+embedded sqlite storage.
+
+Measures the redis of the settings (REDIS_URL) if it is reachable.
+
+Usage: python benchmarks/storage.py
+"""
+
+import os
+import tempfile
+import timeit
+
+import redis
+
+from stock_market_visualizer.app import config_store
+from stock_market_visualizer.app.config_store import ConfigStore
+from stock_market_visualizer.app.engine_scheduler import EngineScheduler
+from stock_market_visualizer.app.redis_helper import init_redis_pool
+from stock_market_visualizer.app.storage import RedisStorage, SqliteStorage
+
+NOF_STATES = 200
+REPEATS = 5
+
+
+def create_state_args(i):
+    indicators = [
+        {"ticker-col": "SPY", "indicator": {"name": "SMA", "config": [i]}},
+    ]
+    return ["Dashboard", f"engine-{i}", "2015-01-01", "2024-06-28", indicators]
+
+
+def store_states(storage):
+    store = ConfigStore(storage)
+    return [
+        store.store_state(*create_state_args(i), [True], [True], [])
+        for i in range(NOF_STATES)
+    ]
+
+
+def load_states(storage, state_ids):
+    store = ConfigStore(storage)
+    scheduler = EngineScheduler(None, storage, None)
+    for state_id in state_ids:
+        # The in-process cache would hide the storage
+        config_store.local_cache.entries.clear()
+        batch = storage.batch()
+        scheduler.track_state(state_id, batch)
+        store.load_state(state_id, batch)
+
+
+def time_per_state(operation):
+    """Returns the best time per state in microseconds"""
+    return 1e6 * min(timeit.repeat(operation, number=1, repeat=REPEATS)) / NOF_STATES
+
+
+def measure(storage):
+    state_ids = store_states(storage)
+    return (
+        time_per_state(lambda: store_states(storage)),
+        time_per_state(lambda: load_states(storage, state_ids)),
+    )
+
+
+def get_storages():
+    path = os.path.join(tempfile.mkdtemp(), "storage.sqlite3")
+    storages = {"sqlite": SqliteStorage(path)}
+    r = init_redis_pool(decode_responses=False)
+    try:
+        r.ping()
+        storages["redis"] = RedisStorage(r)
+    except redis.exceptions.ConnectionError:
+        print("redis is not reachable, only sqlite is measured")
+    return storages
+
+
+def main():
+    storages = get_storages()
+    print(f"{'storage':>7} {'store':>10} {'page load':>10}")
+    for name, storage in storages.items():
+        store_time, load_time = measure(storage)
+        print(f"{name:>7} {store_time:>8.0f}us {load_time:>8.0f}us")
+
+
+if __name__ == "__main__":
+    main()
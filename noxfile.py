@@ -35,3 +35,9 @@ def lint(session):
     session.run(*__flake8_cmd())
     session.run(*__isort_cmd())
     session.run(*__yamllint_cmd())
+
+
+@nox.session(python="3.10", reuse_venv=REUSE_VENV)
+def tests(session):
+    session.install(".[dev]")
+    session.run("pytest")
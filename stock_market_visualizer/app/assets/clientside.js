@@ -0,0 +1,76 @@
+/*
+ * The clientside callbacks, see common/clientside.py. Each function implements the
+ * python callback with the same name.
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+  clientside: {
+    toggle_collapse_table: function (show_table) {
+      return show_table.includes(true);
+    },
+
+    update_header_size: function (title) {
+      return title.length;
+    },
+
+    update_min_date_allowed: function (start_date) {
+      if (start_date === null || start_date === undefined) {
+        return window.dash_clientside.no_update;
+      }
+      return start_date;
+    },
+
+    deactivate_indicator_dropdown: function (show_tickers, ticker_cell) {
+      return !show_tickers || show_tickers.length === 0 || !ticker_cell;
+    },
+
+    update_indicator_dropdown_label: function (disabled, ticker_cell, rows) {
+      if (disabled) {
+        return "Add Indicator";
+      }
+      const ticker = rows[ticker_cell.row][ticker_cell.column_id];
+      return `Add ${ticker} Indicator`;
+    },
+
+    show_disclaimer: function (store) {
+      return !store || !("v0" in store);
+    },
+
+    update_detector_label: function (
+      selected_detector_cell,
+      selected_nodes,
+      selected_edges,
+      detectors
+    ) {
+      const enabled =
+        !!selected_detector_cell &&
+        ((!!selected_nodes &&
+          (selected_nodes.length === 2 || selected_nodes.length === 1)) ||
+          (selected_edges !== null && selected_edges !== undefined));
+      let selected_detector = "(selected detector)";
+      if (selected_detector_cell) {
+        selected_detector = detectors[selected_detector_cell.row]["signal-col"];
+      }
+      return ["Add " + selected_detector + " edge", !enabled];
+    },
+
+    enable_add_signal: function (selected_nodes) {
+      return !selected_nodes || selected_nodes.length === 0;
+    },
+
+    sync_graph_data: function (data) {
+      return "graph" in data ? data.graph : [];
+    },
+
+    update_signal_name: function (custom_name, data) {
+      return Object.assign({}, data, { signal_name: custom_name });
+    },
+
+    update_crossover_name: function (custom_name, data) {
+      return Object.assign({}, data, { crossover_name: custom_name });
+    },
+
+    update_sentiment: function (sentiment, data) {
+      return Object.assign({}, data, { sentiment: sentiment });
+    },
+  },
+});
@@ -0,0 +1,89 @@
+/*
+ * Decodes the typed arrays of the graph figures, {dtype, bdata} with the little
+ * endian bytes of the values in base64, before plotly.js draws them. The plotly.js
+ * bundled with dash does not decode typed arrays itself. Dates are sent as days since
+ * the epoch with unit "D" and are turned into the milliseconds plotly.js uses.
+ */
+(function () {
+  const ARRAY_TYPES = {
+    f8: Float64Array,
+    f4: Float32Array,
+    i4: Int32Array,
+    u4: Uint32Array,
+    i2: Int16Array,
+    u2: Uint16Array,
+    i1: Int8Array,
+    u1: Uint8Array,
+  };
+  const MILLISECONDS_PER_DAY = 86400000;
+
+  function isTypedArray(value) {
+    return (
+      value !== null &&
+      typeof value === "object" &&
+      typeof value.bdata === "string" &&
+      value.dtype in ARRAY_TYPES
+    );
+  }
+
+  function decode(typedArray) {
+    const binary = atob(typedArray.bdata);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+      bytes[i] = binary.charCodeAt(i);
+    }
+    const values = new ARRAY_TYPES[typedArray.dtype](bytes.buffer);
+    if (typedArray.unit === "D") {
+      return Float64Array.from(values, (days) => days * MILLISECONDS_PER_DAY);
+    }
+    return values;
+  }
+
+  function decodeTrace(trace) {
+    // The figure is dash state, the decoded arrays go into a copy of the trace
+    let decoded = trace;
+    for (const key of Object.keys(trace)) {
+      if (isTypedArray(trace[key])) {
+        if (decoded === trace) {
+          decoded = Object.assign({}, trace);
+        }
+        decoded[key] = decode(trace[key]);
+      }
+    }
+    return decoded;
+  }
+
+  function decodeFigure(figure) {
+    if (figure && Array.isArray(figure.data)) {
+      return Object.assign({}, figure, { data: figure.data.map(decodeTrace) });
+    }
+    return figure;
+  }
+
+  function wrap(plotly) {
+    if (!plotly || plotly.decodesTypedArrays) {
+      return plotly;
+    }
+    for (const name of ["react", "newPlot"]) {
+      const plot = plotly[name];
+      plotly[name] = function (gd, data, ...args) {
+        if (Array.isArray(data)) {
+          return plot.call(this, gd, data.map(decodeTrace), ...args);
+        }
+        return plot.call(this, gd, decodeFigure(data), ...args);
+      };
+    }
+    plotly.decodesTypedArrays = true;
+    return plotly;
+  }
+
+  // dcc.Graph loads plotly.js on demand and assigns it to window.Plotly
+  let plotly = wrap(window.Plotly);
+  Object.defineProperty(window, "Plotly", {
+    configurable: true,
+    get: () => plotly,
+    set: (value) => {
+      plotly = wrap(value);
+    },
+  });
+})();
@@ -0,0 +1,70 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+from stock_market.core import TimeSeries
+from stock_market.ext.indicator import ExponentialMovingAverage, Identity, MovingAverage
+
+
+def get_indicator_name(indicator, series_name):
+    if isinstance(indicator, Identity):
+        return series_name
+    return f"{indicator} {series_name}"
+
+
+def get_batch_key(indicator):
+    """Indicators with the same batch key are evaluated in one pass"""
+    if isinstance(indicator, (MovingAverage, ExponentialMovingAverage)):
+        return type(indicator), indicator.period
+    if isinstance(indicator, Identity):
+        return Identity, None
+    return None
+
+
+def evaluate_batch(indicator, matrix):
+    """Evaluates the indicator on each column of the matrix. The columns go through
+    the same pandas kernels as the stock_market indicators, so the results are
+    identical to evaluating the indicator on each series separately."""
+    if isinstance(indicator, MovingAverage):
+        frame = pd.DataFrame(matrix).rolling(indicator.period, min_periods=1)
+        return frame.mean().to_numpy()
+    if isinstance(indicator, ExponentialMovingAverage):
+        return pd.DataFrame(matrix).ewm(span=indicator.period).mean().to_numpy()
+    return matrix
+
+
+def evaluate(indicator, series_name, dates, values):
+    """Evaluates an indicator that cannot be batched on a single series"""
+    indicator_values = indicator(
+        TimeSeries(series_name, pd.DataFrame({"date": dates, "value": values}))
+    )
+    return indicator_values.values.to_numpy()
+
+
+def evaluate_indicators(requests):
+    """
+    Evaluates many indicators on many series at once. 'requests' is a list of
+    (indicator, series name, dates, values) and the values of each indicator are
+    returned in the same order.
+
+    The series of the requests with the same indicator type and period and the same
+    dates are stacked into one matrix, which is evaluated in a single pass. Series
+    with different dates are not aligned, since the missing bars would change the
+    results.
+    """
+    batches = defaultdict(list)
+    results = [None] * len(requests)
+    for i, (indicator, series_name, dates, values) in enumerate(requests):
+        batch_key = get_batch_key(indicator)
+        if batch_key is None:
+            results[i] = evaluate(indicator, series_name, dates, values)
+        else:
+            batches[(batch_key, dates.tobytes())].append(i)
+
+    for indices in batches.values():
+        indicator = requests[indices[0]][0]
+        matrix = np.column_stack([requests[i][3] for i in indices])
+        evaluated = evaluate_batch(indicator, matrix)
+        for column, i in enumerate(indices):
+            results[i] = evaluated[:, column]
+    return results
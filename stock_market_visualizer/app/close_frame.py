@@ -0,0 +1,76 @@
+import numpy as np
+
+
+def get_closes(ohlcs):
+    """Returns the dates and closes arrays of the ohlcs, per ticker"""
+    return {ticker: (ohlc.dates, ohlc.close) for ticker, ohlc in ohlcs.items()}
+
+
+class CloseFrame:
+    """
+    The closes of several tickers in one matrix, with a row per date of the union of
+    their dates and a column per ticker. A ticker without a close on a date holds NaN.
+    """
+
+    def __init__(self, tickers, dates, values):
+        self.tickers = tickers
+        self.dates = dates
+        self.values = values
+
+    @staticmethod
+    def from_closes(closes):
+        """Creates the frame from the dates and closes arrays per ticker"""
+        tickers = [ticker for ticker, (dates, _) in closes.items() if len(dates) > 0]
+        if not tickers:
+            return CloseFrame([], np.array([], dtype="datetime64[D]"), np.empty((0, 0)))
+
+        dates = np.unique(np.concatenate([closes[ticker][0] for ticker in tickers]))
+        values = np.full((len(dates), len(tickers)), np.nan)
+        for column, ticker in enumerate(tickers):
+            ticker_dates, ticker_values = closes[ticker]
+            values[np.searchsorted(dates, ticker_dates), column] = ticker_values
+        return CloseFrame(tickers, dates, values)
+
+    def make_relative(self):
+        """
+        Returns the closes relative to their first close, as a fraction of change.
+
+        Like stock_market's make_relative, the ticker that starts first is the base.
+        The other tickers start at the relative close of the base on their first date,
+        or at the average of the base closes around it if the base has no close then.
+        """
+        valid = ~np.isnan(self.values)
+        first_rows = valid.argmax(axis=0)
+        base = np.argmin(first_rows)
+
+        base_dates = self.dates[valid[:, base]]
+        base_values = self.values[valid[:, base], base]
+        base_values = base_values / base_values[0]
+        start_dates = self.dates[first_rows]
+        upper = np.minimum(
+            np.searchsorted(base_dates, start_dates), len(base_dates) - 1
+        )
+        lower = np.maximum(upper - 1, 0)
+        corrections = np.where(
+            base_dates[upper] == start_dates,
+            base_values[upper],
+            (base_values[lower] + base_values[upper]) / 2.0,
+        )
+        first_values = self.values[first_rows, np.arange(len(self.tickers))]
+        return CloseFrame(
+            self.tickers, self.dates, self.values / (first_values / corrections) - 1
+        )
+
+    def get_close(self, ticker):
+        """Returns the dates and the closes of the ticker. The closes are a view on
+        the matrix unless the ticker misses dates in between."""
+        column = self.values[:, self.tickers.index(ticker)]
+        valid = ~np.isnan(column)
+        first = valid.argmax()
+        last = len(valid) - valid[::-1].argmax()
+        if valid[first:last].all():
+            return self.dates[first:last], column[first:last]
+        return self.dates[valid], column[valid]
+
+    def get_closes(self):
+        return {ticker: self.get_close(ticker) for ticker in self.tickers}
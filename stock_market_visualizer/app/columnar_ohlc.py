@@ -0,0 +1,121 @@
+import json
+
+import msgpack
+import numpy as np
+
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+ACCEPT_HEADERS = {"Accept": f"{MSGPACK_CONTENT_TYPE}, application/json;q=0.9"}
+VALUE_FIELDS = ["open", "high", "low", "close"]
+MILLISECONDS_PER_DAY = 24 * 60 * 60 * 1000
+
+
+def to_epoch_days(dates):
+    return dates.astype("datetime64[D]").astype(np.int64)
+
+
+def from_epoch_days(epoch_days):
+    return np.asarray(epoch_days, dtype=np.int64).astype("datetime64[D]")
+
+
+class ColumnarOHLC:
+    """
+    Open-high-low-close data, stored as one numpy array per field.
+
+    The columnar msgpack encoding is a map holding the dates as little endian int32
+    days since the epoch under "dates" and the values as little endian float64 under
+    "open", "high", "low" and "close".
+    """
+
+    def __init__(self, dates, open, high, low, close):
+        self.dates = dates
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def start(self):
+        return self.dates[0]
+
+    @property
+    def end(self):
+        return self.dates[-1]
+
+    @property
+    def epoch_days(self):
+        return to_epoch_days(self.dates)
+
+    def extend(self, other):
+        """Returns this ohlc extended with the bars of 'other'. On overlapping dates the
+        bars of 'other' are kept. If 'other' starts before this ohlc, 'other' is
+        returned as is."""
+        if len(other) == 0:
+            return self
+        keep = np.searchsorted(self.dates, other.start)
+        return ColumnarOHLC(
+            *[
+                np.concatenate([getattr(self, field)[:keep], getattr(other, field)])
+                for field in ["dates"] + VALUE_FIELDS
+            ]
+        )
+
+    def slice(self, start_date, end_date):
+        """Returns the bars at or after the start date and before the end date"""
+        start, end = np.searchsorted(
+            self.dates, [np.datetime64(start_date, "D"), np.datetime64(end_date, "D")]
+        )
+        return ColumnarOHLC(
+            *[getattr(self, field)[start:end] for field in ["dates"] + VALUE_FIELDS]
+        )
+
+    def to_msgpack(self):
+        columns = {
+            field: getattr(self, field).astype("<f8").tobytes()
+            for field in VALUE_FIELDS
+        }
+        columns["dates"] = self.epoch_days.astype("<i4").tobytes()
+        return msgpack.packb(columns)
+
+    @staticmethod
+    def from_columns(columns):
+        return ColumnarOHLC(
+            from_epoch_days(np.frombuffer(columns["dates"], dtype="<i4")),
+            *[np.frombuffer(columns[field], dtype="<f8") for field in VALUE_FIELDS],
+        )
+
+    @staticmethod
+    def from_msgpack(payload):
+        return ColumnarOHLC.from_columns(msgpack.unpackb(payload))
+
+    @staticmethod
+    def from_json(json_str):
+        """Parses the json encoding of a stock_market OHLC"""
+        json_obj = json.loads(json_str)
+        dates = json.loads(json_obj.pop("dates"))
+        epoch_days = (
+            np.fromiter(dates.values(), dtype=np.int64, count=len(dates))
+            // MILLISECONDS_PER_DAY
+        )
+        order = np.argsort(epoch_days, kind="stable")
+
+        def get_values(field):
+            values = json.loads(json.loads(json_obj[field])["day_data"])["value"]
+            return np.fromiter(values.values(), dtype=np.float64, count=len(values))[
+                order
+            ]
+
+        return ColumnarOHLC(
+            from_epoch_days(epoch_days[order]),
+            *[get_values(field) for field in VALUE_FIELDS],
+        )
+
+    @staticmethod
+    def from_content(content):
+        """Creates the ohlc from a decoded engine response, which is either the
+        columnar msgpack map or the json encoding of a stock_market OHLC."""
+        if isinstance(content, dict):
+            return ColumnarOHLC.from_columns(content)
+        return ColumnarOHLC.from_json(content)
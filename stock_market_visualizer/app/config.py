@@ -18,14 +18,42 @@ class Settings(BaseSettings):
     debug: bool = os.getenv("DEBUG", False)
     max_ticker_symbol_length: int = os.getenv("MAX_TICKER_SYMBOL_LENGTH", 10)
     update_interval: int = os.getenv("UPDATE_INTERVAL_SECONDS", 5 * 60)
+    scheduled_view_window: int = os.getenv(
+        "SCHEDULED_VIEW_WINDOW_SECONDS", 7 * 24 * 60 * 60
+    )
+    max_scheduled_views: int = os.getenv("MAX_SCHEDULED_VIEWS", 1000)
     max_api_endpoint_cache_size: int = os.getenv("MAX_API_ENDPOINT_CACHE_SIZE", 10000)
+    max_concurrent_api_requests: int = os.getenv("MAX_CONCURRENT_API_REQUESTS", 10)
+    max_engine_snapshots: int = os.getenv("MAX_ENGINE_SNAPSHOTS", 32)
+    engine_result_cache_backend: str = os.getenv(
+        "ENGINE_RESULT_CACHE_BACKEND", "memory"
+    )
+    engine_result_cache_size: int = os.getenv(
+        "ENGINE_RESULT_CACHE_SIZE_BYTES", 256 * 1024 * 1024
+    )
+    figure_cache_size: int = os.getenv("FIGURE_CACHE_SIZE_BYTES", 64 * 1024 * 1024)
+    figure_cache_redis: bool = os.getenv("FIGURE_CACHE_REDIS", False)
+    figure_cache_backend: str = os.getenv("FIGURE_CACHE_BACKEND")
+    graph_width_pixels: int = os.getenv("GRAPH_WIDTH_PIXELS", 1920)
+    webgl_point_threshold: int = os.getenv("WEBGL_POINT_THRESHOLD", 20000)
+    full_resolution_cache_size: int = os.getenv("FULL_RESOLUTION_CACHE_SIZE", 16)
+    indicator_cache_size: int = os.getenv("INDICATOR_CACHE_SIZE", 256)
+    holiday_file: str = os.getenv("HOLIDAY_FILE")
+    validate_figures: bool = os.getenv("VALIDATE_FIGURES", False)
+    render_processes: int = os.getenv("RENDER_PROCESSES", 0)
+    render_queue_depth: int = os.getenv("RENDER_QUEUE_DEPTH", 4)
+    compression_minimum_size: int = os.getenv("COMPRESSION_MINIMUM_SIZE_BYTES", 1024)
     max_id_generator: int = os.getenv("MAX_ID_GENERATOR", 10000000)
+    storage_backend: str = os.getenv("STORAGE_BACKEND", "redis")
+    storage_path: str = os.getenv("STORAGE_PATH", "stock_market_visualizer.sqlite3")
     redis_url: str = os.getenv("REDIS_URL", "redis")
     redis_port: int = os.getenv("REDIS_PORT", 6379)
     redis_db: int = os.getenv("REDIS_DB")
     redis_restoreable_state_expiration_time: dt.timedelta = dt.timedelta(
         days=os.getenv("REDIS_RESTOREABLE_STATE_EXPIRATION_DAYS", 30)
     )
+    state_cache_size: int = os.getenv("STATE_CACHE_SIZE", 1024)
+    state_cache_ttl: int = os.getenv("STATE_CACHE_TTL_SECONDS", 60)
     default_engine_config: str = os.getenv("DEFAULT_ENGINE_CONFIG")
     default_view_config: str = os.getenv("DEFAULT_VIEW_CONFIG")
     title: str = os.getenv("TITLE", "Stock Market Engine")
@@ -1,7 +1,12 @@
 import datetime as dt
+import hashlib
 import json
-import uuid
+import threading
+import time
+import zlib
 
+import msgpack
+from lru import LRU
 from simputils.logging import get_logger
 
 from stock_market_visualizer.app.config import get_settings
@@ -9,50 +14,191 @@ from stock_market_visualizer.app.config import get_settings
 logger = get_logger(__name__)
 
 
+class LocalCache:
+    """A bounded in-process cache whose entries expire after ttl seconds"""
+
+    def __init__(self, max_size, ttl):
+        self.entries = LRU(max_size)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            return None
+        return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+
+
+# The states and the default view config id read by this process. A state only
+# changes when the engine scheduler advances it, other processes then show the
+# previous engine until the entry expires.
+local_cache = LocalCache(
+    get_settings().state_cache_size, get_settings().state_cache_ttl
+)
+
+
 class ConfigStore:
     DEFAULT_VIEW_CONFIG_KEY = "DEFAULT_VIEW_CONFIG_ID"
+    # Points the id of a state to the id of the state that replaced it
+    REDIRECT_KEY_PREFIX = "STATE_REDIRECT:"
 
-    def __init__(self, redis):
-        self.__redis = redis
+    def __init__(self, storage):
+        self.__storage = storage
 
     def get(self, key) -> str:
-        value = self.__redis.get(key)
+        value = self.__storage.get(key)
         if value is None:
             return None
-        return value
+        return value.decode()
 
     def set(self, key, value, *args) -> None:
-        self.__redis.set(key, value, *args)
+        self.__storage.set(key, value, *args)
 
-    def store_state(
-        self,
-        header_title,
-        engine_id,
-        start_date,
-        end_date,
-        indicators,
-        show_ticker_table,
-        show_indicator_table,
-        show_signal_table,
-    ) -> str:
-        state = {}
-        state["header-title"] = header_title
-        state["engine-id"] = engine_id
-        state["start-date"] = start_date
-        state["end-date"] = end_date
-        state["indicators"] = indicators
-        state["show-ticker-table"] = show_ticker_table
-        state["show-indicator-table"] = show_indicator_table
-        state["show-signal-table"] = show_signal_table
-
-        state_id = str(uuid.uuid4())
-        self.set(
+    def __store_state(self, state, batch):
+        # Identical states share their id, storing one again refreshes its expiration
+        state_id = get_state_id(state)
+        batch.set(
             state_id,
-            json.dumps(state),
+            encode_state(state),
             get_settings().redis_restoreable_state_expiration_time,
         )
+        local_cache.set(state_id, state)
         return state_id
 
+    def store_state(self, *args, default=False) -> str:
+        """Stores the state of the arguments of create_state and returns its id. The
+        default state is stored as the default view config in the same request."""
+        batch = self.__storage.batch()
+        state_id = self.__store_state(create_state(*args), batch)
+        if default:
+            batch.set(self.DEFAULT_VIEW_CONFIG_KEY, state_id)
+        batch.execute()
+        if default:
+            local_cache.set(self.DEFAULT_VIEW_CONFIG_KEY, state_id)
+        return state_id
+
+    def get_default_view_config_id(self) -> str:
+        view_config_id = local_cache.get(self.DEFAULT_VIEW_CONFIG_KEY)
+        if view_config_id is None:
+            view_config_id = self.get(self.DEFAULT_VIEW_CONFIG_KEY)
+            if view_config_id is not None:
+                local_cache.set(self.DEFAULT_VIEW_CONFIG_KEY, view_config_id)
+        return view_config_id
+
+    def __get_redirect_key(self, state_id):
+        return self.REDIRECT_KEY_PREFIX + state_id
+
+    def __resolve(self, state_ids, results):
+        """Decodes the stored states of the ids from the results of getting their
+        redirect keys and states in turn, following the redirects in one request"""
+        redirects = [
+            None if redirect is None else redirect.decode()
+            for redirect in results[0::2]
+        ]
+        payloads = results[1::2]
+        targets = [target for target in redirects if target is not None]
+        if targets:
+            batch = self.__storage.batch()
+            for target in targets:
+                batch.get(target)
+            target_payloads = iter(batch.execute())
+            # The original state is still shown, if the redirected one expired
+            payloads = [
+                payload if target is None else next(target_payloads) or payload
+                for target, payload in zip(redirects, payloads)
+            ]
+        states = []
+        for state_id, payload in zip(state_ids, payloads):
+            state = None if payload is None else decode_state(payload)
+            if state is not None:
+                local_cache.set(state_id, state)
+            states.append(state)
+        return states
+
+    def load_state(self, state_id, batch=None) -> dict:
+        """Returns the stored state, or None if there is none. The operations of the
+        batch are sent in the same request, if the state is requested."""
+        state = local_cache.get(state_id)
+        if state is not None:
+            if batch is not None:
+                batch.execute()
+            return state
+
+        if batch is None:
+            batch = self.__storage.batch()
+        batch.get(self.__get_redirect_key(state_id))
+        batch.get(state_id)
+        return self.__resolve([state_id], batch.execute()[-2:])[0]
+
+    def load_states(self, state_ids) -> list:
+        """Returns the stored states of the ids, None for the ones without a state.
+        Reads all of them in one request."""
+        batch = self.__storage.batch()
+        for state_id in state_ids:
+            batch.get(self.__get_redirect_key(state_id))
+            batch.get(state_id)
+        return self.__resolve(state_ids, batch.execute())
+
+    def redirect_states(self, states) -> None:
+        """Stores the states under their own ids and redirects the given ids to them,
+        so the links of the given ids show the new states"""
+        batch = self.__storage.batch()
+        for state_id, state in states.items():
+            batch.set(
+                self.__get_redirect_key(state_id),
+                self.__store_state(state, batch),
+                get_settings().redis_restoreable_state_expiration_time,
+            )
+            local_cache.set(state_id, state)
+        batch.execute()
+
+
+def create_state(
+    header_title,
+    engine_id,
+    start_date,
+    end_date,
+    indicators,
+    show_ticker_table,
+    show_indicator_table,
+    show_signal_table,
+):
+    state = {}
+    state["header-title"] = header_title
+    state["engine-id"] = engine_id
+    state["start-date"] = start_date
+    state["end-date"] = end_date
+    state["indicators"] = indicators
+    state["show-ticker-table"] = show_ticker_table
+    state["show-indicator-table"] = show_indicator_table
+    state["show-signal-table"] = show_signal_table
+    return state
+
+
+def get_state_id(state):
+    """The hash of the canonical json of the state"""
+    canonical = json.dumps(state, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+def encode_state(state):
+    return zlib.compress(msgpack.packb(state))
+
+
+def decode_state(payload):
+    # States stored under uuid4 ids before are plain json
+    if payload.startswith(b"{"):
+        return json.loads(payload)
+    return msgpack.unpackb(zlib.decompress(payload))
+
 
 def load_json_from_file(file_path):
     if file_path is None:
@@ -63,22 +209,22 @@ def load_json_from_file(file_path):
     return config
 
 
-def configure_default_configs(api, redis, settings) -> None:
+def configure_default_configs(api, storage, settings) -> None:
     engine_config = load_json_from_file(settings.default_engine_config)
     if engine_config is None:
         return None
 
     view_config = load_json_from_file(settings.default_view_config)
-    engine_id = configure_default_engine(api, redis, engine_config, view_config)
+    engine_id = configure_default_engine(api, storage, engine_config, view_config)
     if engine_id is None:
         return None
 
     if view_config is None:
         return None
-    configure_default_engine_view(engine_id, redis, engine_config, view_config)
+    configure_default_engine_view(engine_id, storage, engine_config, view_config)
 
 
-def configure_default_engine(api, redis, engine_config, view_config) -> None:
+def configure_default_engine(api, storage, engine_config, view_config) -> None:
     start_date = dt.datetime.now().date() - dt.timedelta(
         days=int(view_config["last_x_days"])
     )
@@ -88,24 +234,25 @@ def configure_default_engine(api, redis, engine_config, view_config) -> None:
         sd["config"] = json.dumps(sd["config"])
 
     engine = api.create_engine_from_json(json.dumps(engine_config))
-    end_date = dt.datetime.now().date().isoformat()
-    engine = engine.update_engine(end_date)
+    # The exclusive end date of the view, see DateLayout.get_engine_dates, so the
+    # default engine is shown as is
+    end_date = dt.datetime.now().date() + dt.timedelta(days=1)
+    engine = engine.update_engine(end_date.isoformat())
 
     return engine.engine_id
 
 
-def configure_default_engine_view(engine_id, redis, engine_config, view_config) -> None:
+def configure_default_engine_view(
+    engine_id, storage, engine_config, view_config
+) -> None:
     start_date = engine_config["stock_market"]["start_date"]
     end_date = dt.datetime.now().date().isoformat()
-    config_store = ConfigStore(redis)
+    config_store = ConfigStore(storage)
 
-    view_config_id = config_store.get(ConfigStore.DEFAULT_VIEW_CONFIG_KEY)
+    view_config_id = config_store.get_default_view_config_id()
     if view_config_id is not None:
-        default_config = config_store.get(view_config_id)
-        if (
-            default_config is not None
-            and json.loads(default_config)["engine-id"] == engine_id
-        ):
+        default_config = config_store.load_state(view_config_id)
+        if default_config is not None and default_config["engine-id"] == engine_id:
             return
 
     view_config["engine_id"] = str(engine_id)
@@ -123,7 +270,7 @@ def configure_default_engine_view(engine_id, redis, engine_config, view_config)
         bool_to_list(view_config["show_ticker_table"]),
         bool_to_list(view_config["show_indicator_table"]),
         bool_to_list(view_config["show_signal_table"]),
+        default=True,
     )
-    config_store.set(ConfigStore.DEFAULT_VIEW_CONFIG_KEY, view_config_id)
 
     logger.info(f"(Re)configured default view config: {view_config_id}")
@@ -6,6 +6,8 @@ from dash import dcc, html
 from dash_extensions.enrich import Input, Output, State
 from simputils.dateutils import from_sdate
 
+from stock_market_visualizer.common.clientside import clientside_callback
+
 
 class DateLayout:
     def __init__(self, engine_layout, ticker_layout, signal_layout):
@@ -58,6 +60,20 @@ class DateLayout:
             )
         )
 
+    def get_engine_dates(self, start_date, end_date):
+        """Returns the start date and the exclusive end date of the engine for the
+        given picker dates, or None if a date is missing"""
+        start_date = from_sdate(start_date)
+        end_date = from_sdate(end_date)
+
+        if start_date is None:
+            return None
+        if end_date is None:
+            return None
+
+        end_date = min(end_date, dt.datetime.now().date())
+        return start_date, end_date + dt.timedelta(days=1)
+
     def __get_signal_detectors(self, rows):
         signal_detectors = []
         for row in rows:
@@ -68,7 +84,8 @@ class DateLayout:
         return signal_detectors
 
     def register_callbacks(self, app, engine_api):
-        @app.callback(
+        @clientside_callback(
+            app,
             Output(self.end_date_picker, "min_date_allowed"),
             Input(*self.get_start_date()),
         )
@@ -92,15 +109,10 @@ class DateLayout:
             signal_detector_rows,
             engine_id,
         ):
-            start_date = from_sdate(start_date)
-            end_date = from_sdate(end_date)
-
-            if start_date is None:
-                return dash.no_update
-            if end_date is None:
+            engine_dates = self.get_engine_dates(start_date, end_date)
+            if engine_dates is None:
                 return dash.no_update
-
-            end_date = min(end_date, dt.datetime.now().date())
+            start_date, end_date = engine_dates
 
             tickers = self.ticker_layout.get_tickers(ticker_rows)
             signal_detectors = self.__get_signal_detectors(signal_detector_rows)
@@ -112,7 +124,14 @@ class DateLayout:
             if engine is None:
                 return dash.no_update
 
-            engine_start_date = engine.get_start_date()
+            if engine_id is None:
+                engine_start_date = engine.get_start_date()
+            else:
+                snapshot = engine_api.get_snapshot(engine_id)
+                engine_start_date = snapshot.start_date
+                # Restored states are kept current by the engine scheduler
+                if engine_start_date == start_date and snapshot.end_date == end_date:
+                    return engine_id
             if engine_start_date is None:
                 return dash.no_update
 
@@ -121,7 +140,5 @@ class DateLayout:
                 if engine is None:
                     return dash.no_update
 
-            new_engine = engine.update_engine(
-                end_date + dt.timedelta(days=1)
-            )  # Make exclusive
+            new_engine = engine.update_engine(end_date)
             return new_engine.engine_id
@@ -0,0 +1,76 @@
+import asyncio
+import datetime as dt
+
+from simputils.logging import get_logger
+
+from stock_market_visualizer.app.config_store import (
+    ConfigStore,
+    configure_default_configs,
+)
+from stock_market_visualizer.app.storage import LockError
+
+logger = get_logger(__name__)
+
+# Creating and updating the default engine takes several engine requests
+LOCK_TIMEOUT_SECONDS = 10 * 60
+VISITOR_WAIT_SECONDS = 60
+
+
+class DefaultConfigRefresher:
+    """
+    Keeps the default engine and view config current, which the root url shows. Every
+    update interval the workers check whether they were rebuilt today, they are rebuilt
+    once per day by the worker that takes the refresh lock in the storage. Visitors
+    only read the stored view config id.
+    """
+
+    LOCK_KEY = "DEFAULT_VIEW_CONFIG_LOCK"
+    REFRESHED_KEY = "DEFAULT_VIEW_CONFIG_REFRESHED"
+
+    def __init__(self, api, storage, settings):
+        self.__api = api
+        self.__storage = storage
+        self.__settings = settings
+
+    def __is_current(self):
+        # The refreshed key holds the date of the last rebuild
+        today = dt.datetime.now().date().isoformat()
+        return ConfigStore(self.__storage).get(self.REFRESHED_KEY) == today
+
+    def refresh(self, blocking=False):
+        """Rebuilds the default configs if they are not current and no other worker
+        is rebuilding them. With blocking, waits for a rebuild by another worker."""
+        lock = self.__storage.lock(
+            self.LOCK_KEY,
+            timeout=LOCK_TIMEOUT_SECONDS,
+            blocking_timeout=VISITOR_WAIT_SECONDS,
+        )
+        if not lock.acquire(blocking=blocking):
+            return
+        try:
+            if self.__is_current():
+                return
+            configure_default_configs(self.__api, self.__storage, self.__settings)
+            self.__storage.set(self.REFRESHED_KEY, dt.datetime.now().date().isoformat())
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                logger.warning("The default config refresh outlived its lock")
+
+    def get_view_config_id(self):
+        config_store = ConfigStore(self.__storage)
+        view_config_id = config_store.get_default_view_config_id()
+        if view_config_id is None:
+            # Only before the first refresh
+            self.refresh(blocking=True)
+            view_config_id = config_store.get_default_view_config_id()
+        return view_config_id
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception:
+                logger.exception("Refreshing the default configs failed")
+            await asyncio.sleep(self.__settings.update_interval)
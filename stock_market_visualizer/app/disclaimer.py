@@ -3,6 +3,8 @@ import dash_bootstrap_components as dbc
 from dash import dcc, html
 from dash_extensions.enrich import Input, Output, State
 
+from stock_market_visualizer.common.clientside import clientside_callback
+
 
 class DisclaimerLayout:
     def __init__(self):
@@ -80,7 +82,9 @@ class DisclaimerLayout:
         return self.button_id, "n_clicks"
 
     def register_callbacks(self, app):
-        @app.callback(Output(*self.is_open()), Input(*self.get_stored_disclaimer()))
+        @clientside_callback(
+            app, Output(*self.is_open()), Input(*self.get_stored_disclaimer())
+        )
         def show_disclaimer(store):
             return store is None or "v0" not in store
 
@@ -0,0 +1,37 @@
+import numpy as np
+
+
+def get_envelope_indices(y, max_points):
+    """
+    Returns the indices of the points kept by a min/max envelope of at most
+    'max_points' points. The first and last point are always kept, the points in
+    between are split into buckets of which the lowest and the highest point are
+    kept, so every peak and dip of the line stays visible.
+
+    The buckets are laid out as rows of one matrix, padding the shorter ones, so all
+    of them are selected at once.
+    """
+    nof_points = len(y)
+    if max_points >= nof_points or max_points < 4:
+        return np.arange(nof_points)
+
+    nof_buckets = (max_points - 2) // 2
+    edges = np.linspace(1, nof_points - 1, nof_buckets + 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    bucket_indices = starts[:, np.newaxis] + np.arange((ends - starts).max())
+    in_bucket = bucket_indices < ends[:, np.newaxis]
+    values = y[np.minimum(bucket_indices, nof_points - 1)]
+    lowest = np.where(in_bucket, values, np.inf).argmin(axis=1)
+    highest = np.where(in_bucket, values, -np.inf).argmax(axis=1)
+    # A bucket of a single point, or of equal points, keeps its point once
+    return np.unique(
+        np.concatenate([[0], starts + lowest, starts + highest, [nof_points - 1]])
+    )
+
+
+def downsample(dates, values, max_points):
+    """Downsamples the dates and values of a line to at most 'max_points' points"""
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    values = np.asarray(values, dtype=np.float64)
+    indices = get_envelope_indices(values, max_points)
+    return dates[indices], values[indices]
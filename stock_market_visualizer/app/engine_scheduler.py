@@ -0,0 +1,143 @@
+import asyncio
+import datetime as dt
+import time
+
+from simputils.dateutils import from_sdate
+from simputils.logging import get_logger
+
+from stock_market_visualizer.app.config_store import ConfigStore
+from stock_market_visualizer.app.storage import LockError
+
+logger = get_logger(__name__)
+
+# A run advances at most every tracked view once, which takes two engine requests
+# and a snapshot fetch per engine
+LOCK_TIMEOUT_SECONDS = 10 * 60
+
+
+class EngineScheduler:
+    """
+    Keeps the engines of recently viewed states current. Every update interval, one
+    worker across the replicas updates their engines to the latest date: the one that
+    takes the scheduler lock in the storage, if no worker advanced them within the
+    last update interval. It fetches the snapshots of the updated engines into the
+    caches and stores the states with the updated engine ids and end dates, to which
+    the viewed state ids are redirected. Returning visitors then get the current chart
+    without waiting for the engine update.
+    """
+
+    LOCK_KEY = "ENGINE_SCHEDULER_LOCK"
+    VIEWED_STATES_KEY = "RECENTLY_VIEWED_STATES"
+    ADVANCED_KEY = "ENGINE_SCHEDULER_ADVANCED"
+
+    def __init__(self, api, storage, settings):
+        self.__api = api
+        self.__storage = storage
+        self.__settings = settings
+
+    def track_state(self, state_id, batch=None):
+        """Records a view of the stored state, in the batch if there is one"""
+        storage = self.__storage if batch is None else batch
+        storage.set_scores(self.VIEWED_STATES_KEY, {state_id: time.time()})
+
+    def __get_viewed_states(self):
+        """The recently viewed state ids and their last view times, latest first"""
+        self.__storage.remove_scores_below(
+            self.VIEWED_STATES_KEY,
+            time.time() - self.__settings.scheduled_view_window,
+        )
+        return self.__storage.get_highest_scores(
+            self.VIEWED_STATES_KEY, self.__settings.max_scheduled_views
+        )
+
+    def __follows_latest_date(self, state, viewed_at):
+        """Whether the view showed the latest date when it was last viewed. States of
+        a past period keep their end date. A day of slack covers the views right
+        before midnight."""
+        end_date = from_sdate(state.get("end-date"))
+        if end_date is None or state.get("engine-id") is None:
+            return False
+        viewed_date = dt.date.fromtimestamp(viewed_at)
+        return end_date >= viewed_date - dt.timedelta(days=1)
+
+    def __is_advanced(self):
+        # The advanced key holds the time of the last run
+        advanced_at = ConfigStore(self.__storage).get(self.ADVANCED_KEY)
+        if advanced_at is None:
+            return False
+        return time.time() - float(advanced_at) < self.__settings.update_interval
+
+    def __advance_engine(self, engine_id, end_date):
+        """Returns the id of the engine updated to the exclusive end date, with the
+        snapshot of an updated engine fetched. None if the update failed."""
+        engine = self.__api.get_engine(engine_id)
+        date = engine.get_date()
+        if date is None:
+            return None
+        if date >= end_date:
+            return engine_id
+        updated = engine.update_engine(end_date)
+        if updated.engine_id == engine_id:
+            return None
+        self.__api.get_snapshot(updated.engine_id)
+        return updated.engine_id
+
+    def advance(self):
+        """Advances the recently viewed states to the latest date, unless another
+        worker is advancing them or advanced them within the update interval"""
+        lock = self.__storage.lock(self.LOCK_KEY, timeout=LOCK_TIMEOUT_SECONDS)
+        if not lock.acquire(blocking=False):
+            return
+        try:
+            if self.__is_advanced():
+                return
+            config_store = ConfigStore(self.__storage)
+            today = dt.datetime.now().date()
+            viewed_states = self.__get_viewed_states()
+            states = config_store.load_states(
+                [state_id for state_id, _ in viewed_states]
+            )
+            advanced = {}
+            advanced_states = {}
+            removed = []
+            for (state_id, viewed_at), state in zip(viewed_states, states):
+                if state is None:
+                    removed.append(state_id)
+                    continue
+                if not self.__follows_latest_date(state, viewed_at):
+                    continue
+
+                engine_id = state["engine-id"]
+                if engine_id not in advanced:
+                    advanced[engine_id] = self.__advance_engine(
+                        engine_id, today + dt.timedelta(days=1)
+                    )
+                advanced_state = {
+                    **state,
+                    "engine-id": advanced[engine_id],
+                    "end-date": today.isoformat(),
+                }
+                if advanced[engine_id] is None or advanced_state == state:
+                    continue
+                advanced_states[state_id] = advanced_state
+            config_store.redirect_states(advanced_states)
+            self.__storage.remove_scores(self.VIEWED_STATES_KEY, removed)
+            self.__storage.set(self.ADVANCED_KEY, str(time.time()))
+            updated = [e for e, a in advanced.items() if a not in (None, e)]
+            if updated:
+                logger.info(
+                    f"Advanced {len(updated)} engines of recently viewed states"
+                )
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                logger.warning("Advancing the viewed engines outlived its lock")
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.advance)
+            except Exception:
+                logger.exception("Advancing the viewed engines failed")
+            await asyncio.sleep(self.__settings.update_interval)
@@ -0,0 +1,161 @@
+import copy
+from functools import cache
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from stock_market_visualizer.app.typed_array import encode_dates, encode_values
+
+TEMPLATE = "plotly_white"
+MARGIN = dict(l=0, r=0, b=0, t=0)
+LEGEND = {"orientation": "h"}
+RELATIVE_TICK_FORMAT = ",.1%"
+SIGNAL_ROW_HEIGHTS = [0.9, 0.1]
+
+
+def add_signal_row(figure):
+    """Adds a second row, with a hidden y axis, below the graph for the signals that
+    do not belong to a single ticker"""
+    figure = figure.set_subplots(
+        rows=2, cols=1, shared_xaxes=True, row_heights=SIGNAL_ROW_HEIGHTS
+    )
+    figure.update_yaxes(visible=False, col=1, row=2)
+    return figure
+
+
+def as_contiguous(values):
+    """orjson only serializes contiguous numpy arrays, plotly falls back to cleaning
+    the whole figure in python for any other array"""
+    if isinstance(values, np.ndarray):
+        return np.ascontiguousarray(values)
+    return values
+
+
+@cache
+def get_template():
+    return pio.templates[TEMPLATE].to_plotly_json()
+
+
+@cache
+def get_signal_row_layout():
+    return add_signal_row(go.Figure()).layout.to_plotly_json()
+
+
+class GraphObjectsFigureBuilder:
+    """Builds the figure with plotly graph objects, which validate every property"""
+
+    def __init__(self):
+        self.figure = go.Figure()
+        self.figure["layout"].update(margin=MARGIN)
+        self.has_signal_row = False
+
+    def get_line_data(self, dates, values):
+        return {"x": dates, "y": values}
+
+    def add_lines(self, lines, line_type):
+        scatter = go.Scattergl if line_type == "scattergl" else go.Scatter
+        self.figure.add_traces(
+            [
+                scatter(
+                    **self.get_line_data(dates, values),
+                    name=name,
+                    mode="lines",
+                    meta=line_id,
+                )
+                for line_id, name, dates, values in lines
+            ]
+        )
+
+    def set_relative(self):
+        self.figure.update_yaxes(tickformat=RELATIVE_TICK_FORMAT)
+
+    def add_signal_row(self):
+        if not self.has_signal_row:
+            self.figure = add_signal_row(self.figure)
+            self.has_signal_row = True
+
+    def add_markers(self, name, dates, values, marker, in_signal_row=False):
+        trace = go.Scatter(name=name, x=dates, y=values, mode="markers", marker=marker)
+        if in_signal_row:
+            self.figure.add_trace(trace, col=1, row=2)
+        else:
+            self.figure.add_trace(trace)
+
+    def get_traces(self):
+        return [trace.to_plotly_json() for trace in self.figure.data]
+
+    def build(self):
+        self.figure.update_layout(template=TEMPLATE, legend=LEGEND)
+        return self.figure
+
+
+class FigureBuilder:
+    """Builds the figure as a plain dict, with the same content as the
+    GraphObjectsFigureBuilder. The template and the subplot layout are validated once
+    by plotly, the traces are not validated at all.
+
+    With typed arrays, the lines are sent as typed arrays instead of json lists of
+    date strings and floats, see typed_array.py."""
+
+    def __init__(self, typed_arrays=True):
+        self.typed_arrays = typed_arrays
+        self.data = []
+        self.layout = {"margin": dict(MARGIN)}
+
+    def get_line_data(self, dates, values):
+        if self.typed_arrays:
+            return {"x": encode_dates(dates), "y": encode_values(values)}
+        return {"x": as_contiguous(dates), "y": as_contiguous(values)}
+
+    def add_lines(self, lines, line_type):
+        self.data.extend(
+            {
+                "type": line_type,
+                **self.get_line_data(dates, values),
+                "name": name,
+                "mode": "lines",
+                "meta": line_id,
+            }
+            for line_id, name, dates, values in lines
+        )
+
+    def set_relative(self):
+        self.layout.setdefault("yaxis", {})["tickformat"] = RELATIVE_TICK_FORMAT
+
+    def add_signal_row(self):
+        if "yaxis2" in self.layout:
+            return
+        for axis, properties in copy.deepcopy(get_signal_row_layout()).items():
+            self.layout[axis] = {**properties, **self.layout.get(axis, {})}
+
+    def add_markers(self, name, dates, values, marker, in_signal_row=False):
+        trace = {
+            "type": "scatter",
+            "name": name,
+            "x": as_contiguous(dates),
+            "y": as_contiguous(values),
+            "mode": "markers",
+            "marker": marker,
+        }
+        if in_signal_row:
+            trace.update(xaxis="x2", yaxis="y2")
+        self.data.append(trace)
+
+    def get_traces(self):
+        return self.data
+
+    def build(self):
+        self.layout.update(template=get_template(), legend=LEGEND)
+        if self.typed_arrays:
+            # Plotly only detects dates in strings, the typed dates are numbers
+            self.layout.setdefault("xaxis", {})["type"] = "date"
+            if "xaxis2" in self.layout:
+                self.layout["xaxis2"]["type"] = "date"
+        return {"data": self.data, "layout": self.layout}
+
+
+def create_figure_builder(validate):
+    if validate:
+        return GraphObjectsFigureBuilder()
+    return FigureBuilder()
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import threading
+from functools import cache
+
+import plotly.io as pio
+import ujson
+
+from stock_market_visualizer.app.config import get_settings
+from stock_market_visualizer.app.trading_calendar import get_trading_calendar
+
+# Bumped whenever the same inputs are rendered into a different figure
+FIGURE_FORMAT_VERSION = 1
+
+
+@cache
+def get_render_settings():
+    """The settings that change the rendered figure. The figure caches may be shared
+    by replicas with other settings."""
+    settings = get_settings()
+    holidays = get_trading_calendar().calendar.holidays
+    return (
+        FIGURE_FORMAT_VERSION,
+        settings.graph_width_pixels,
+        settings.webgl_point_threshold,
+        hashlib.sha256(holidays.tobytes()).hexdigest(),
+        settings.validate_figures,
+    )
+
+
+def get_figure_key(*inputs):
+    """Canonical hash of the inputs and the render settings that fully determine a
+    figure"""
+    return hashlib.sha256(
+        json.dumps(
+            (get_render_settings(), inputs), sort_keys=True, default=str
+        ).encode()
+    ).hexdigest()
+
+
+class FigureCache:
+    """Caches serialized figures. The tiers are checked in order, a hit in a later tier
+    is copied to the earlier ones."""
+
+    def __init__(self, tiers):
+        self.tiers = tiers
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        for i, tier in enumerate(self.tiers):
+            figure_json = tier.get((key,))
+            if figure_json is None:
+                continue
+            for earlier_tier in self.tiers[:i]:
+                earlier_tier.set((key,), figure_json)
+            with self.lock:
+                self.hits += 1
+            return ujson.loads(figure_json)
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, figure):
+        figure_json = pio.to_json(figure, validate=False)
+        for tier in self.tiers:
+            tier.set((key,), figure_json)
+
+    def get_stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": [len(tier) for tier in self.tiers],
+            "size": [tier.size for tier in self.tiers],
+        }
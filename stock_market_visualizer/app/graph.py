@@ -1,47 +1,32 @@
-from collections import Counter, defaultdict
-from itertools import groupby
+import datetime as dt
+from collections import Counter
 
 import dash
 import dash_bootstrap_components as dbc
-import pandas as pd
-import plotly.graph_objects as go
 from dash import dcc
-from dash_extensions.enrich import Input, Output
-from dateutil.rrule import DAILY, FR, MO, TH, TU, WE, rrule
-from simputils.algos import all_equal, max_dist_indices, split_elements
-from stock_market.common.factory import Factory
-from stock_market.core import OHLC, Sentiment
-from stock_market.core.time_series import TimeSeries, make_relative
-from stock_market.ext.indicator import register_indicator_factories
-
-from stock_market_visualizer.app.signals.common import (
-    get_sentiment_colors,
-    get_sentiment_shape,
-)
-
-
-class SentimentColorProvider:
-    def __init__(self, sentiment_counters):
-        if sentiment_counters.total() == 0:
-            return
-        self.colors = {
-            s: get_sentiment_colors(s, sentiment_counters[s]) for s in Sentiment
-        }
-        self.index_generators = {
-            s: max_dist_indices(sentiment_counters[s]) for s in Sentiment
-        }
+from dash_extensions.enrich import Input, Output, State
+from lru import LRU
 
-    def get(self, sentiment):
-        return self.colors[sentiment][next(self.index_generators[sentiment])]
+from stock_market_visualizer.app.close_frame import get_closes
+from stock_market_visualizer.app.config import get_settings
+from stock_market_visualizer.app.figure_cache import get_figure_key
+from stock_market_visualizer.app.graph_renderer import GraphRenderer
 
 
 class GraphLayout:
-    def __init__(self, engine_layout):
+    def __init__(self, engine_layout, date_layout):
         self.engine_layout = engine_layout
+        self.date_layout = date_layout
         self.stock_market_graph = "stock-market-graph"
+        self.graph_state = "stock-market-graph-state"
+        self.full_resolution_lines = LRU(get_settings().full_resolution_cache_size)
+        self.renderer = GraphRenderer()
         self.layout = dbc.Col(
             dbc.Container(
-                dcc.Graph(id=self.stock_market_graph, style={"height": "60vh"})
+                [
+                    dcc.Graph(id=self.stock_market_graph, style={"height": "60vh"}),
+                    dcc.Store(id=self.graph_state),
+                ]
             )
         )
 
@@ -51,195 +36,335 @@ class GraphLayout:
     def get_graph(self):
         return self.stock_market_graph, "figure"
 
-    def __get_configured_indicators(self, rows):
-        factory = register_indicator_factories(Factory())
-        indicators_per_ticker = defaultdict(list)
-        for i, row in enumerate(rows):
-            indicators_per_ticker[row["ticker-col"]].append(
-                factory.create(row["indicator"]["name"], row["indicator"]["config"])
-            )
-        return indicators_per_ticker
+    def get_relayout_data(self):
+        return self.stock_market_graph, "relayoutData"
+
+    def get_graph_state(self):
+        return self.graph_state, "data"
 
-    def __create_indicator_traces(
-        self, indicators_per_ticker, ticker, ticker_values, figure
+    def __get_indicator_configs(self, rows):
+        return [
+            (row["ticker-col"], row["indicator"]["name"], row["indicator"]["config"])
+            for row in rows
+        ]
+
+    def __get_state(
+        self, figure_key, engine_id, engine_dates, indicator_configs, traces, line_type
     ):
-        for indicator in indicators_per_ticker[ticker]:
-            for indicator_values in [
-                indicator(
-                    TimeSeries(
-                        ticker,
-                        pd.concat(
-                            [ticker_values.dates, ticker_values.values],
-                            axis=1,
-                        ),
-                    )
-                )
-            ]:
-                trimmed_indicator_values = indicator_values.start_at(
-                    rrule(
-                        DAILY,
-                        dtstart=indicator_values.start,
-                        byweekday=(MO, TU, WE, TH, FR),
-                    )[indicator.lag_days()].date()
-                )
-                figure.add_trace(
-                    go.Scatter(
-                        x=trimmed_indicator_values.dates,
-                        y=trimmed_indicator_values.values,
-                        name=trimmed_indicator_values.name,
-                        mode="lines",
-                    )
-                )
+        """The inputs of the shown figure, the line id of each of its traces, None for
+        signal markers, and the trace type of its lines. Used to update the figure
+        with a Patch."""
+        return {
+            "figure_key": figure_key,
+            "engine_id": engine_id,
+            "engine_dates": (
+                None if engine_dates is None else list(map(str, engine_dates))
+            ),
+            "indicator_configs": indicator_configs,
+            "traces": traces,
+            "line_type": line_type,
+        }
 
-        return figure
+    def __get_figure_state(
+        self, figure_key, engine_id, engine_dates, indicator_configs, traces
+    ):
+        line_types = [t["type"] for t in traces if t.get("meta") is not None]
+        traces = [
+            None if trace.get("meta") is None else list(trace["meta"])
+            for trace in traces
+        ]
+        return self.__get_state(
+            figure_key,
+            engine_id,
+            engine_dates,
+            indicator_configs,
+            traces,
+            line_types[0] if line_types else None,
+        )
 
-    def __get_signal_lines(self, engine, ticker_closes, figure):
-        def get_signal_name(s):
-            return s.name
+    def __get_indicators_update(self, state, snapshot, added, removed):
+        patch = dash.Patch()
+        traces = list(state["traces"])
+        for indicator_config in removed.elements():
+            # The indicators of tickers without closes have no trace
+            if list(indicator_config) not in traces:
+                continue
+            index = len(traces) - 1 - traces[::-1].index(list(indicator_config))
+            del patch["data"][index]
+            del traces[index]
 
-        def get_signal_sentiment(s):
-            return s.sentiment
+        lines = self.renderer.get_lines(
+            self.renderer.get_ticker_closes(get_closes(snapshot.ohlcs)),
+            list(added.elements()),
+        )
+        lines = [line for line in lines if line[0][1] is not None]
+        line_type = self.__insert_line_traces(patch, traces, lines, state["line_type"])
+        return patch, traces, lines, line_type
 
-        def __add_signals(figure, index, signals, color_provider):
-            grouped_signals = groupby(
-                split_elements(signals, key=get_signal_sentiment),
-                key=get_signal_sentiment,
-            )
-            groups = [
-                list(sentiment_signals_iter)
-                for _, sentiment_signals_iter in grouped_signals
-            ]
-            if len(groups) > 0:
-                figure = figure.set_subplots(
-                    rows=2, cols=1, shared_xaxes=True, row_heights=[0.9, 0.1]
-                )
-                figure.update_yaxes(visible=False, col=1, row=2)
-            for sentiment_signals in groups:
-                first = sentiment_signals[0]
-                sentiment = first.sentiment
-                figure.add_trace(
-                    go.Scatter(
-                        name=first.name
-                        + ("" if len(groups) == 1 else f" ({sentiment.value})"),
-                        x=[s.date for s in sentiment_signals],
-                        y=[index] * len(sentiment_signals),
-                        mode="markers",
-                        marker_symbol=get_sentiment_shape(sentiment),
-                        marker_color=color_provider.get(sentiment),
-                    ),
-                    col=1,
-                    row=2,
-                )
-            return figure
-
-        def __add_ticker_signals(figure, signals, ticker_closes, color_provider):
-            ticker_symbol = signals[0].tickers[0].symbol
-            ticker_close = ticker_closes[ticker_symbol]
-            grouped_signals = groupby(
-                split_elements(signals, key=get_signal_sentiment),
-                key=get_signal_sentiment,
-            )
-            groups = [
-                list(sentiment_signals_iter)
-                for _, sentiment_signals_iter in grouped_signals
-            ]
-            for sentiment_signals in groups:
-                first = sentiment_signals[0]
-                sentiment = first.sentiment
-                figure.add_trace(
-                    go.Scatter(
-                        name=first.name
-                        + f" ({ticker_symbol})"
-                        + ("" if len(groups) == 1 else f" ({sentiment.value})"),
-                        x=[s.date for s in sentiment_signals],
-                        y=[
-                            ticker_close.time_values[
-                                ticker_close.time_values.date == s.date
-                            ].value.iloc[0]
-                            for s in sentiment_signals
-                        ],
-                        mode="markers",
-                        marker_symbol=get_sentiment_shape(sentiment),
-                        marker_size=12,
-                        marker_color=color_provider.get(sentiment),
-                    )
-                )
-            return figure
-
-        all_signals = sorted(engine.get_signals().signals, key=get_signal_name)
-        grouped_signals = groupby(all_signals, key=get_signal_name)
-        unique_name_sentiments = set((s.name, s.sentiment) for s in all_signals)
-        sentiment_counters = Counter(s for (_, s) in unique_name_sentiments)
-        color_provider = SentimentColorProvider(sentiment_counters)
-        for i, (g, signals) in enumerate(grouped_signals):
-            signals = list(signals)
-            assert all_equal([s.tickers for s in signals])
-            if len(signals[0].tickers) == 1:
-                __add_ticker_signals(figure, signals, ticker_closes, color_provider)
+    def __insert_line_traces(self, patch, traces, lines, line_type):
+        """Inserts the traces of the lines where a full render puts them, the closes
+        after the other closes and the indicators before the signal markers. Returns
+        the trace type of the lines of the figure."""
+        for trace in self.renderer.get_line_traces(lines, line_type):
+            line_type = trace["type"]
+            line_id = list(trace["meta"])
+            if line_id[1] is None:
+                index = sum(1 for t in traces if t is not None and t[1] is None)
             else:
-                __add_signals(figure, i, signals, color_provider)
+                index = traces.index(None) if None in traces else len(traces)
+            patch["data"].insert(index, trace)
+            traces.insert(index, line_id)
+        return line_type
+
+    def __get_tickers_update(self, state, snapshot, lines):
+        """Replaces the signal markers and inserts the given lines"""
+        patch = dash.Patch()
+        traces = list(state["traces"])
+        for index in reversed(range(len(traces))):
+            if traces[index] is None:
+                del patch["data"][index]
+                del traces[index]
 
-        return figure
+        line_type = self.__insert_line_traces(patch, traces, lines, state["line_type"])
+        for trace in self.renderer.get_signal_traces(
+            snapshot.signals,
+            self.renderer.get_ticker_closes(get_closes(snapshot.ohlcs)),
+        ):
+            patch["data"].append(trace)
+            traces.append(None)
+        return patch, traces, line_type
 
-    def __get_ticker_closes(self, engine):
-        tickers = engine.get_tickers()
-        closes = {}
+    def __get_removed_ticker_update(self, state, snapshot, ticker):
+        patch, traces, line_type = self.__get_tickers_update(state, snapshot, [])
+        for index in reversed(range(len(traces))):
+            if traces[index] is not None and traces[index][0] == ticker:
+                del patch["data"][index]
+                del traces[index]
+        return patch, traces, [], line_type
 
-        if len(tickers) == 0:
-            return closes
+    def __get_added_ticker_update(self, state, snapshot, ticker):
+        if ticker not in snapshot.ohlcs:
+            return None
+        closes = self.renderer.get_ticker_closes(get_closes(snapshot.ohlcs))
+        lines = self.renderer.get_lines(
+            {ticker: closes[ticker]}, list(map(tuple, state["indicator_configs"]))
+        )
+        patch, traces, line_type = self.__get_tickers_update(state, snapshot, lines)
+        return patch, traces, lines, line_type
+
+    def __has_same_relative_base(self, previous, snapshot):
+        """Whether the closes of the tickers that are in both snapshots are the same,
+        which is the case if both have multiple tickers and the close all others are
+        relative to is the same in both. Tickers without bars have no start, those
+        snapshots are rendered in full."""
+        if len(previous.ohlcs) < 2 or len(snapshot.ohlcs) < 2:
+            return False
+        ohlcs = [*previous.ohlcs.values(), *snapshot.ohlcs.values()]
+        if any(len(ohlc) == 0 for ohlc in ohlcs):
+            return False
+        base = min(previous.ohlcs, key=lambda ticker: previous.ohlcs[ticker].start)
+        return base == min(
+            snapshot.ohlcs, key=lambda ticker: snapshot.ohlcs[ticker].start
+        )
 
-        for ticker in tickers:
-            ohlc_json = engine.get_ticker_ohlc(ticker)
-            if ohlc_json is None:
+    def __has_signal_row(self, snapshot):
+        return any(len(s.tickers) != 1 for s in snapshot.signals.signals)
+
+    def __get_x_range(self, relayout_data):
+        """Returns the visible dates of a zoom, (None, None) when the zoom is reset and
+        None when the x axis did not change."""
+        for key, value in (relayout_data or {}).items():
+            axis, _, prop = key.partition(".")
+            if not axis.startswith("xaxis"):
                 continue
-            closes[ticker] = OHLC.from_json(ohlc_json).close
-
-        if len(closes) > 1:
-            closes = zip(closes.keys(), make_relative(closes.values()))
-            closes = {
-                ticker: TimeSeries(
-                    ticker,
-                    pd.concat(
-                        [relative_close.dates, relative_close.values - 1], axis=1
-                    ),
-                )
-                for ticker, relative_close in closes
-            }
-        return closes
-
-    def __get_traces(self, closes, indicators, figure):
-        for ticker, close in closes.items():
-            figure.add_trace(
-                go.Scatter(x=close.dates, y=close.values, name=ticker, mode="lines"),
+            if prop == "autorange":
+                return None, None
+            if prop == "range":
+                return tuple(value)
+            if prop == "range[0]":
+                return value, relayout_data[f"{axis}.range[1]"]
+        return None
+
+    def __get_zoom_update(self, x_range, traces, lines):
+        lines_per_id = {tuple(line[0]): line for line in lines}
+        figure = self.renderer.create_figure_builder()
+        patch = dash.Patch()
+        for index, line_id in enumerate(traces):
+            if line_id is None or tuple(line_id) not in lines_per_id:
+                continue
+            ((_, _, dates, values),) = self.renderer.get_visible_lines(
+                [lines_per_id[tuple(line_id)]], *x_range
             )
+            patch["data"][index].update(figure.get_line_data(dates, values))
+        return patch
+
+    def __is_zoom_only(self):
+        return dash.callback_context.triggered_prop_ids.keys() == {
+            ".".join(self.get_relayout_data())
+        }
 
-        for ticker, close in closes.items():
-            figure = self.__create_indicator_traces(indicators, ticker, close, figure)
-        return figure
-
-    def __get_traces_and_layout(self, engine, indicators):
-        figure = go.Figure()
-        figure["layout"].update(margin=dict(l=0, r=0, b=0, t=0))
-
-        ticker_closes = self.__get_ticker_closes(engine)
-        nof_ticker_lines = len(ticker_closes)
-        figure = self.__get_traces(ticker_closes, indicators, figure)
-        if nof_ticker_lines > 1:
-            figure.update_yaxes(tickformat=",.1%")
-        if nof_ticker_lines > 0:
-            figure = self.__get_signal_lines(engine, ticker_closes, figure)
-        figure.update_layout(template="plotly_white", legend={"orientation": "h"})
-        return figure
-
-    def register_callbacks(self, app, engine_api):
+    def __is_date_change_only(self):
+        date_prop_ids = {
+            ".".join(self.date_layout.get_start_date()),
+            ".".join(self.date_layout.get_end_date()),
+        }
+        return set(dash.callback_context.triggered_prop_ids) <= date_prop_ids
+
+    def register_callbacks(self, app, engine_api, figure_cache, render_pool=None):
         @app.callback(
             Output(*self.get_graph()),
+            Output(*self.get_graph_state()),
             Input("indicator-table", "data"),
             Input(*self.engine_layout.get_id()),
+            Input(*self.date_layout.get_start_date()),
+            Input(*self.date_layout.get_end_date()),
+            Input(*self.get_relayout_data()),
+            State(*self.get_graph_state()),
         )
-        def change(rows, engine_id):
-            indicators = self.__get_configured_indicators(rows)
-            engine = engine_api.get_engine(engine_id)
-            if engine is None:
-                return dash.no_update
-            return self.__get_traces_and_layout(engine, indicators)
+        def change(rows, engine_id, start_date, end_date, relayout_data, state):
+            engine_dates = self.date_layout.get_engine_dates(start_date, end_date)
+            indicator_configs = self.__get_indicator_configs(rows)
+            figure_key = get_figure_key(engine_id, engine_dates, indicator_configs)
+
+            # A zoom only replaces the line data of the figure, with the part of the
+            # full resolution lines that is visible.
+            if self.__is_zoom_only():
+                x_range = self.__get_x_range(relayout_data)
+                if x_range is None or state is None:
+                    return dash.no_update, dash.no_update
+                lines = get_full_resolution_lines(state)
+                if lines is None:
+                    return dash.no_update, dash.no_update
+                return (
+                    self.__get_zoom_update(x_range, state["traces"], lines),
+                    dash.no_update,
+                )
+
+            # Adding or removing indicators or a ticker only sends the changed traces
+            update = get_update(state, engine_id, engine_dates, indicator_configs)
+            if update is not None:
+                patch, traces, lines, line_type = update
+                previous_lines = self.full_resolution_lines.get(state["figure_key"])
+                if previous_lines is not None:
+                    self.full_resolution_lines[figure_key] = previous_lines + lines
+                return patch, self.__get_state(
+                    figure_key,
+                    engine_id,
+                    engine_dates,
+                    indicator_configs,
+                    traces,
+                    line_type,
+                )
+
+            figure = figure_cache.get(figure_key)
+            if figure is not None:
+                return figure, self.__get_figure_state(
+                    figure_key,
+                    engine_id,
+                    engine_dates,
+                    indicator_configs,
+                    figure["data"],
+                )
+
+            snapshot = get_snapshot(engine_id, engine_dates)
+            if snapshot is None:
+                return dash.no_update, dash.no_update
+            rendered = render(snapshot, indicator_configs)
+            if rendered is None:
+                # The pool is saturated, the last good figure stays shown
+                return dash.no_update, dash.no_update
+            figure, traces, lines = rendered
+            # A figure of an engine with failed reads is rendered again next time
+            if snapshot.complete:
+                self.full_resolution_lines[figure_key] = lines
+                figure_cache.set(figure_key, figure)
+            return figure, self.__get_figure_state(
+                figure_key, engine_id, engine_dates, indicator_configs, traces
+            )
+
+        def get_update(state, engine_id, engine_dates, indicator_configs):
+            """Returns a Patch of the shown figure, its traces, the new full
+            resolution lines and the trace type of the lines, if only indicators or a
+            ticker changed. None otherwise."""
+            if state is None or engine_dates is None:
+                return None
+            if state["engine_dates"] != list(map(str, engine_dates)):
+                return None
+
+            previous_configs = Counter(map(tuple, state["indicator_configs"]))
+            configs = Counter(indicator_configs)
+            if state["engine_id"] == engine_id:
+                snapshot = get_snapshot(engine_id, engine_dates)
+                if snapshot is None:
+                    return None
+                return self.__get_indicators_update(
+                    state,
+                    snapshot,
+                    configs - previous_configs,
+                    previous_configs - configs,
+                )
+
+            origin = engine_api.result_cache.get_origin(engine_id)
+            if origin is None or origin[0] != state["engine_id"]:
+                return None
+            if previous_configs != configs:
+                return None
+            previous = get_snapshot(state["engine_id"], engine_dates)
+            if previous is None:
+                return None
+            operation, ticker = origin[1]
+            if operation == "remove_ticker":
+                get_ticker_update = self.__get_removed_ticker_update
+            else:
+                get_ticker_update = self.__get_added_ticker_update
+            snapshot = get_snapshot(engine_id, engine_dates)
+            if (
+                snapshot is None
+                or not self.__has_same_relative_base(previous, snapshot)
+                or self.__has_signal_row(previous) != self.__has_signal_row(snapshot)
+            ):
+                return None
+            return get_ticker_update(state, snapshot, ticker)
+
+        def get_full_resolution_lines(state):
+            lines = self.full_resolution_lines.get(state["figure_key"])
+            if lines is not None:
+                return lines
+            engine_dates = (
+                None
+                if state["engine_dates"] is None
+                else [dt.date.fromisoformat(date) for date in state["engine_dates"]]
+            )
+            snapshot = get_snapshot(state["engine_id"], engine_dates)
+            if snapshot is None:
+                return None
+            lines = self.renderer.get_lines(
+                self.renderer.get_ticker_closes(get_closes(snapshot.ohlcs)),
+                list(map(tuple, state["indicator_configs"])),
+            )
+            if snapshot.complete:
+                self.full_resolution_lines[state["figure_key"]] = lines
+            return lines
+
+        def render(snapshot, indicator_configs):
+            """Returns the figure, its traces and the full resolution lines, rendered
+            in the render pool if there is one. None if the pool is saturated."""
+            closes = get_closes(snapshot.ohlcs)
+            if render_pool is None:
+                return self.renderer.get_traces_and_layout(
+                    closes, snapshot.signals, indicator_configs
+                )
+            return render_pool.render(closes, snapshot.signals, indicator_configs)
+
+        def get_snapshot(engine_id, engine_dates):
+            snapshot = engine_api.get_snapshot(engine_id)
+            if snapshot is None:
+                return None
+
+            # A date window within the current engine is sliced locally, the engine
+            # for the new window redraws the graph once it is created.
+            if engine_dates is not None and snapshot.covers(*engine_dates):
+                return snapshot.slice(*engine_dates)
+            if self.__is_date_change_only():
+                return None
+            return snapshot
@@ -0,0 +1,247 @@
+from collections import Counter
+from itertools import groupby
+
+import numpy as np
+from simputils.algos import all_equal, max_dist_indices, split_elements
+from stock_market.common.factory import Factory
+from stock_market.core import Sentiment
+from stock_market.ext.indicator import register_indicator_factories
+
+from stock_market_visualizer.app.close_frame import CloseFrame
+from stock_market_visualizer.app.columnar_ohlc import to_epoch_days
+from stock_market_visualizer.app.config import get_settings
+from stock_market_visualizer.app.downsampling import downsample
+from stock_market_visualizer.app.figure_builder import create_figure_builder
+from stock_market_visualizer.app.indicator_cache import IndicatorCache
+from stock_market_visualizer.app.signals.common import (
+    get_sentiment_colors,
+    get_sentiment_shape,
+)
+from stock_market_visualizer.app.trading_calendar import get_trading_calendar
+
+
+class SentimentColorProvider:
+    def __init__(self, sentiment_counters):
+        if sentiment_counters.total() == 0:
+            return
+        self.colors = {
+            s: get_sentiment_colors(s, sentiment_counters[s]) for s in Sentiment
+        }
+        self.index_generators = {
+            s: max_dist_indices(sentiment_counters[s]) for s in Sentiment
+        }
+
+    def get(self, sentiment):
+        return self.colors[sentiment][next(self.index_generators[sentiment])]
+
+
+class DateValueLookup:
+    """Looks up the values of a series at many dates at once, using a binary search on
+    the sorted epoch days of the series. Dates without a value in the series get NaN,
+    which plotly does not draw."""
+
+    def __init__(self, dates, values):
+        self.epoch_days = to_epoch_days(dates)
+        self.values = np.asarray(values, dtype=float)
+
+    def get(self, dates):
+        epoch_days = to_epoch_days(np.array(dates, dtype="datetime64[D]"))
+        result = np.full(len(epoch_days), np.nan)
+        if len(self.epoch_days) == 0:
+            return result
+        indices = np.minimum(
+            np.searchsorted(self.epoch_days, epoch_days), len(self.epoch_days) - 1
+        )
+        found = self.epoch_days[indices] == epoch_days
+        result[found] = self.values[indices[found]]
+        return result
+
+
+class GraphRenderer:
+    """Assembles the lines and the figure of the graph from the closes of the tickers,
+    which are given as ticker to (dates, closes) arrays."""
+
+    def __init__(self):
+        self.indicator_cache = IndicatorCache(get_settings().indicator_cache_size)
+
+    def get_indicator_lines(self, indicator_configs, closes):
+        """Evaluates all indicators of all tickers at once, in the order of the
+        closes and then of the indicator configs"""
+        factory = register_indicator_factories(Factory())
+        requests = [
+            (
+                indicator_config,
+                factory.create(*indicator_config[1:]),
+                ticker,
+                *closes[ticker],
+            )
+            for ticker in closes
+            for indicator_config in indicator_configs
+            if indicator_config[0] == ticker
+        ]
+        lines = []
+        for (indicator_config, indicator, ticker, dates, _), (
+            name,
+            indicator_values,
+        ) in zip(requests, self.indicator_cache.get_many(requests)):
+            trim_date = get_trading_calendar().offset(dates[0], indicator.lag_days())
+            keep = dates >= trim_date
+            lines.append(
+                (list(indicator_config), name, dates[keep], indicator_values[keep])
+            )
+
+        return lines
+
+    def get_signal_lines(self, signals, ticker_closes, figure):
+        def get_signal_name(s):
+            return s.name
+
+        def get_signal_sentiment(s):
+            return s.sentiment
+
+        def __add_signals(figure, index, signals, color_provider):
+            grouped_signals = groupby(
+                split_elements(signals, key=get_signal_sentiment),
+                key=get_signal_sentiment,
+            )
+            groups = [
+                list(sentiment_signals_iter)
+                for _, sentiment_signals_iter in grouped_signals
+            ]
+            if len(groups) > 0:
+                figure.add_signal_row()
+            for sentiment_signals in groups:
+                first = sentiment_signals[0]
+                sentiment = first.sentiment
+                figure.add_markers(
+                    first.name + ("" if len(groups) == 1 else f" ({sentiment.value})"),
+                    [s.date for s in sentiment_signals],
+                    [index] * len(sentiment_signals),
+                    dict(
+                        symbol=get_sentiment_shape(sentiment),
+                        color=color_provider.get(sentiment),
+                    ),
+                    in_signal_row=True,
+                )
+            return figure
+
+        def __add_ticker_signals(figure, signals, close_lookups, color_provider):
+            ticker_symbol = signals[0].tickers[0].symbol
+            close_lookup = close_lookups[ticker_symbol]
+            grouped_signals = groupby(
+                split_elements(signals, key=get_signal_sentiment),
+                key=get_signal_sentiment,
+            )
+            groups = [
+                list(sentiment_signals_iter)
+                for _, sentiment_signals_iter in grouped_signals
+            ]
+            for sentiment_signals in groups:
+                first = sentiment_signals[0]
+                sentiment = first.sentiment
+                dates = [s.date for s in sentiment_signals]
+                figure.add_markers(
+                    first.name
+                    + f" ({ticker_symbol})"
+                    + ("" if len(groups) == 1 else f" ({sentiment.value})"),
+                    dates,
+                    close_lookup.get(dates),
+                    dict(
+                        symbol=get_sentiment_shape(sentiment),
+                        size=12,
+                        color=color_provider.get(sentiment),
+                    ),
+                )
+            return figure
+
+        all_signals = sorted(signals.signals, key=get_signal_name)
+        grouped_signals = groupby(all_signals, key=get_signal_name)
+        unique_name_sentiments = set((s.name, s.sentiment) for s in all_signals)
+        sentiment_counters = Counter(s for (_, s) in unique_name_sentiments)
+        color_provider = SentimentColorProvider(sentiment_counters)
+        close_lookups = {
+            ticker: DateValueLookup(*close) for ticker, close in ticker_closes.items()
+        }
+        for i, (g, signals) in enumerate(grouped_signals):
+            signals = list(signals)
+            assert all_equal([s.tickers for s in signals])
+            if len(signals[0].tickers) == 1:
+                __add_ticker_signals(figure, signals, close_lookups, color_provider)
+            else:
+                __add_signals(figure, i, signals, color_provider)
+
+        return figure
+
+    def get_ticker_closes(self, closes):
+        """Returns the dates and closes per ticker, relative to their start if there
+        are multiple tickers"""
+        closes = CloseFrame.from_closes(closes)
+        if len(closes.tickers) > 1:
+            closes = closes.make_relative()
+        return closes.get_closes()
+
+    def get_lines(self, closes, indicator_configs):
+        """Returns the full resolution lines as (line id, name, dates, values). The
+        line id of a close is [ticker, None, None], the line id of an indicator is its
+        indicator config."""
+        lines = [
+            ([ticker, None, None], ticker, *close) for ticker, close in closes.items()
+        ]
+        lines.extend(self.get_indicator_lines(indicator_configs, closes))
+        return lines
+
+    def get_visible_lines(self, lines, start_date, end_date):
+        """Downsamples the part of the lines between the dates, including the points
+        just outside so the lines reach the edges of the graph."""
+        width = get_settings().graph_width_pixels
+        visible_lines = []
+        for line_id, name, dates, values in lines:
+            if start_date is not None:
+                start, end = np.searchsorted(
+                    dates,
+                    [np.datetime64(start_date[:10]), np.datetime64(end_date[:10])],
+                )
+                start, end = max(start - 1, 0), end + 1
+                dates, values = dates[start:end], values[start:end]
+            visible_lines.append((line_id, name, *downsample(dates, values, width)))
+        return visible_lines
+
+    def get_line_type(self, visible_lines):
+        # WebGL takes over once the drawn points slow down SVG
+        nof_points = sum(len(dates) for _, _, dates, _ in visible_lines)
+        if nof_points > get_settings().webgl_point_threshold:
+            return "scattergl"
+        return "scatter"
+
+    def create_figure_builder(self):
+        return create_figure_builder(get_settings().validate_figures)
+
+    def get_line_traces(self, lines, line_type=None):
+        """Returns the traces of the lines, downsampled to the pixel budget. The line
+        id is kept as the meta of the trace. Without a line type, it is chosen by the
+        number of drawn points."""
+        figure = self.create_figure_builder()
+        visible_lines = self.get_visible_lines(lines, None, None)
+        figure.add_lines(visible_lines, line_type or self.get_line_type(visible_lines))
+        return figure.get_traces()
+
+    def get_signal_traces(self, signals, ticker_closes):
+        figure = self.create_figure_builder()
+        self.get_signal_lines(signals, ticker_closes, figure)
+        return figure.get_traces()
+
+    def get_traces_and_layout(self, closes, signals, indicator_configs):
+        """Returns the figure, its traces and the full resolution lines"""
+        figure = self.create_figure_builder()
+        ticker_closes = self.get_ticker_closes(closes)
+        nof_ticker_lines = len(ticker_closes)
+        lines = self.get_lines(ticker_closes, indicator_configs)
+        # Signal markers are added at their exact dates on the full resolution closes
+        visible_lines = self.get_visible_lines(lines, None, None)
+        figure.add_lines(visible_lines, self.get_line_type(visible_lines))
+        if nof_ticker_lines > 1:
+            figure.set_relative()
+        if nof_ticker_lines > 0:
+            self.get_signal_lines(signals, ticker_closes, figure)
+        traces = figure.get_traces()
+        return figure.build(), traces, lines
@@ -2,6 +2,7 @@ from dash import dcc, html
 from dash_extensions.enrich import Input, Output
 
 from stock_market_visualizer.app.config import get_settings
+from stock_market_visualizer.common.clientside import clientside_callback
 
 
 class HeaderLayout:
@@ -45,6 +46,6 @@ class HeaderLayout:
         return self.layout
 
     def register_callbacks(self, app):
-        @app.callback(Output(self.title, "size"), Input(*self.get_title()))
+        @clientside_callback(app, Output(self.title, "size"), Input(*self.get_title()))
         def update_header_size(title):
             return len(title)
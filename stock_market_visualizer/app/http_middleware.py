@@ -0,0 +1,153 @@
+import gzip
+from urllib.parse import parse_qs
+
+from dash.fingerprint import check_fingerprint
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+# Higher qualities compress little better but several times slower
+BROTLI_QUALITY = 5
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json",
+    "application/javascript",
+    "text/",
+    "image/svg+xml",
+)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def get_quality(parameters):
+    """Returns the q-value of the parameters of an accepted encoding, 0 if it is
+    invalid"""
+    for parameter in parameters:
+        name, _, value = parameter.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def get_encoding(accept_encoding):
+    """Returns the encoding the client prefers of the ones the server supports, brotli
+    on a tie, or None. Encodings with a q-value of 0 are not acceptable, see RFC 9110
+    section 12.5.3."""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        encoding, *parameters = item.split(";")
+        qualities[encoding.strip().lower()] = get_quality(parameters)
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    candidates = [
+        (qualities.get(encoding, qualities.get("*", 0.0)), encoding)
+        for encoding in supported
+    ]
+    quality, encoding = max(candidates, key=lambda candidate: candidate[0])
+    if quality <= 0:
+        return None
+    return encoding
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Compresses the responses of the given paths with brotli, if installed, or gzip,
+    once their body reaches the minimum size. The dash responses are not streamed,
+    so the body is compressed at once, in a worker thread."""
+
+    def __init__(self, app, paths, minimum_size):
+        self.app = app
+        self.paths = tuple(paths)
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = get_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        body = []
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await self.__send(start_message, b"".join(body), encoding, send)
+
+        await self.app(scope, receive, send_compressed)
+
+    def __is_compressible(self, start_message, body):
+        headers = Headers(raw=start_message["headers"])
+        return (
+            start_message["status"] == 200
+            and len(body) >= self.minimum_size
+            and "content-encoding" not in headers
+            and headers.get("content-type", "").startswith(COMPRESSIBLE_CONTENT_TYPES)
+        )
+
+    async def __send(self, start_message, body, encoding, send):
+        if self.__is_compressible(start_message, body):
+            # Compressing large figures takes milliseconds, which would block the
+            # other requests on the event loop
+            body = await run_in_threadpool(compress, body, encoding)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(body))
+            headers.add_vary_header("accept-encoding")
+            start_message["headers"] = headers.raw
+        await send(start_message)
+        await send({"type": "http.response.body", "body": body})
+
+
+class ImmutableAssetMiddleware:
+    """Lets browsers cache the assets that dash versions in their url for a year
+    without revalidating: the assets with their modification time in the 'm'
+    parameter and the fingerprinted component suites."""
+
+    def __init__(self, app, assets_path, component_suites_path):
+        self.app = app
+        self.assets_path = assets_path
+        self.component_suites_path = component_suites_path
+
+    def __is_immutable(self, scope):
+        path = scope["path"]
+        if path.startswith(self.assets_path):
+            return "m" in parse_qs(scope["query_string"].decode("latin-1"))
+        if path.startswith(self.component_suites_path):
+            return check_fingerprint(path)[1]
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.__is_immutable(scope):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_immutable(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(raw=message["headers"])
+                headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+                message["headers"] = headers.raw
+            await send(message)
+
+        await self.app(scope, receive, send_immutable)
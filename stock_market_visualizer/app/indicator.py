@@ -6,6 +6,7 @@ from simputils.inspection import get_constructor_arguments
 from stock_market.ext.indicator import ExponentialMovingAverage, Identity, MovingAverage
 
 from stock_market_visualizer.common.checkable_table import CheckableTableLayout
+from stock_market_visualizer.common.clientside import clientside_callback
 
 
 def get_indicators_with_identity():
@@ -110,7 +111,8 @@ class IndicatorLayout:
         def get_active_ticker(cell, rows):
             return rows[cell["row"]][cell["column_id"]]
 
-        @app.callback(
+        @clientside_callback(
+            app,
             Input(*self.ticker_layout.get_show_ticker_table()),
             Input(*self.ticker_layout.get_active_ticker()),
             Output(*self.checkable_table.dropdown_button.get_disabled()),
@@ -118,7 +120,8 @@ class IndicatorLayout:
         def deactivate_indicator_dropdown(show_tickers, ticker_cell):
             return not show_tickers or ticker_cell is None
 
-        @app.callback(
+        @clientside_callback(
+            app,
             Input(*self.checkable_table.dropdown_button.get_disabled()),
             Input(*self.ticker_layout.get_active_ticker()),
             Input(*self.ticker_layout.get_ticker_table_virtual()),
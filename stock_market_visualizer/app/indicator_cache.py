@@ -0,0 +1,167 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from lru import LRU
+from stock_market.ext.indicator import ExponentialMovingAverage, MovingAverage
+
+from stock_market_visualizer.app.batched_indicators import (
+    evaluate_indicators,
+    get_indicator_name,
+)
+
+
+class ExponentialMovingAverageExtender:
+    """Extends the adjusted exponential moving average of pandas, by carrying the
+    weighted sum of the values and the sum of the weights forward"""
+
+    def __init__(self, period):
+        self.period = period
+        self.decay = 1 - 2 / (period + 1)
+
+    def get_state(self, values, result):
+        weights = float(np.sum(self.decay ** np.arange(len(values))))
+        return result[-1] * weights, weights
+
+    def extend(self, state, values):
+        weighted_sum, weights = state
+        result = np.empty(len(values))
+        for i, value in enumerate(values):
+            weighted_sum = value + self.decay * weighted_sum
+            weights = 1 + self.decay * weights
+            result[i] = weighted_sum / weights
+        return result, (weighted_sum, weights)
+
+
+class MovingAverageExtender:
+    """Extends the moving average of pandas, by keeping the last values of the rolling
+    window"""
+
+    def __init__(self, period):
+        self.period = period
+
+    def __get_window(self, values):
+        start = max(len(values) - self.period + 1, 0)
+        return values[start:]
+
+    def __mean(self, values):
+        return pd.Series(values).rolling(self.period, min_periods=1).mean().to_numpy()
+
+    def get_state(self, values, result):
+        return self.__get_window(values)
+
+    def extend(self, state, values):
+        window = np.concatenate([state, values])
+        nof_values = len(values)
+        result = self.__mean(window)[-nof_values:]
+        return result, self.__get_window(window)
+
+
+def get_extender(indicator):
+    if isinstance(indicator, ExponentialMovingAverage):
+        return ExponentialMovingAverageExtender(indicator.period)
+    if isinstance(indicator, MovingAverage):
+        return MovingAverageExtender(indicator.period)
+    return None
+
+
+class IndicatorCacheEntry:
+    def __init__(self, dates, values, result, state):
+        self.length = len(values)
+        self.end_date = dates[-1]
+        self.end_value = values[-1]
+        self.result = result
+        self.state = state
+
+    def is_prefix_of(self, dates, values):
+        """Whether the series of this entry is the start of the given series. Only the
+        last bar of the entry is compared, the bars of an engine never change."""
+        return (
+            self.length <= len(values)
+            and dates[self.length - 1] == self.end_date
+            and values[self.length - 1] == self.end_value
+        )
+
+
+class IndicatorCache:
+    """
+    Caches indicator values per (ticker, series fingerprint, indicator name, config).
+    The fingerprint of a series is its first date and value, together with its length
+    and last date and value.
+
+    If a series only grew at the end, the cached values of the indicators that
+    support it are extended with the new bars instead of being recomputed.
+    """
+
+    def __init__(self, max_size):
+        self.entries = LRU(max_size)
+        self.hits = 0
+        self.extensions = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __count(self, counter):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, indicator_config, indicator, series_name, dates, values):
+        """Returns the name and the values of the indicator applied to the series"""
+        return self.get_many(
+            [(indicator_config, indicator, series_name, dates, values)]
+        )[0]
+
+    def get_many(self, requests):
+        """Returns the name and the values of the indicators applied to the series of
+        all requests, which are (indicator config, indicator, series name, dates,
+        values). The indicators that are neither cached nor extendable are evaluated
+        in one batch."""
+        results = [None] * len(requests)
+        missing = []
+        for i, (indicator_config, indicator, series_name, dates, values) in enumerate(
+            requests
+        ):
+            name = get_indicator_name(indicator, series_name)
+            if len(values) == 0:
+                results[i] = name, values
+                continue
+
+            key = (tuple(indicator_config), dates[0], values[0])
+            entry = self.entries.get(key)
+            extender = get_extender(indicator)
+            if entry is not None and entry.is_prefix_of(dates, values):
+                if entry.length == len(values):
+                    self.__count("hits")
+                    results[i] = name, entry.result
+                    continue
+                if extender is not None:
+                    self.__count("extensions")
+                    length = entry.length
+                    new_values = values[length:]
+                    result, state = extender.extend(entry.state, new_values)
+                    result = np.concatenate([entry.result, result])
+                    self.entries[key] = IndicatorCacheEntry(
+                        dates, values, result, state
+                    )
+                    results[i] = name, result
+                    continue
+
+            self.__count("misses")
+            missing.append(i)
+
+        evaluated = evaluate_indicators([requests[i][1:] for i in missing])
+        for i, result in zip(missing, evaluated):
+            indicator_config, indicator, series_name, dates, values = requests[i]
+            extender = get_extender(indicator)
+            state = None if extender is None else extender.get_state(values, result)
+            key = (tuple(indicator_config), dates[0], values[0])
+            self.entries[key] = IndicatorCacheEntry(dates, values, result, state)
+            results[i] = get_indicator_name(indicator, series_name), result
+        return results
+
+    def get_stats(self):
+        return {
+            "hits": self.hits,
+            "extensions": self.extensions,
+            "misses": self.misses,
+            "entries": len(self.entries),
+        }
@@ -21,7 +21,7 @@ class Layout:
         self.date_layout = DateLayout(
             self.engine_layout, self.ticker_layout, self.signal_detector_layout
         )
-        self.graph_layout = GraphLayout(self.engine_layout)
+        self.graph_layout = GraphLayout(self.engine_layout, self.date_layout)
         self.disclaimer_layout = DisclaimerLayout()
         self.restoreable_state_layout = RestoreableStateLayout()
 
@@ -52,12 +52,12 @@ class Layout:
     def get_layout(self):
         return self.layout
 
-    def register_callbacks(self, app, engine_api, redis):
+    def register_callbacks(self, app, engine_api, storage, figure_cache, render_pool):
         self.disclaimer_layout.register_callbacks(app)
         self.header_layout.register_callbacks(app)
         self.date_layout.register_callbacks(app, engine_api)
-        self.graph_layout.register_callbacks(app, engine_api)
+        self.graph_layout.register_callbacks(app, engine_api, figure_cache, render_pool)
         self.ticker_layout.register_callbacks(app, engine_api)
         self.indicator_layout.register_callbacks(app)
         self.signal_detector_layout.register_callbacks(app, engine_api)
-        self.restoreable_state_layout.register_callbacks(app, engine_api, redis)
+        self.restoreable_state_layout.register_callbacks(app, engine_api, storage)
@@ -1,16 +1,40 @@
-import requests_cache
+import asyncio
+
+import httpx
+import plotly.io as pio
 import uvicorn as uvicorn
 from dash_extensions.enrich import DashProxy, MultiplexerTransform
 from fastapi import FastAPI
 from starlette.middleware.wsgi import WSGIMiddleware
 
 from stock_market_visualizer.app.config import get_settings
+from stock_market_visualizer.app.default_config_refresher import (
+    DefaultConfigRefresher,
+)
+from stock_market_visualizer.app.engine_scheduler import EngineScheduler
+from stock_market_visualizer.app.figure_cache import FigureCache
+from stock_market_visualizer.app.http_middleware import (
+    CompressionMiddleware,
+    ImmutableAssetMiddleware,
+)
 from stock_market_visualizer.app.layout import Layout
 from stock_market_visualizer.app.redis_helper import init_redis_pool
-from stock_market_visualizer.app.stock_market_engine_api import StockMarketEngineApi
+from stock_market_visualizer.app.render_pool import RenderPool
+from stock_market_visualizer.app.stock_market_engine_api import (
+    AsyncStockMarketEngineApi,
+    EngineResultCache,
+    InProcessCacheTier,
+    RedisCacheTier,
+    SqliteCacheTier,
+    StockMarketEngineApi,
+)
+from stock_market_visualizer.app.storage import SqliteStorage, create_storage
 
 settings = get_settings()
 
+# Dash and the figure cache serialize figures with the plotly json engine
+pio.json.config.default_engine = "orjson"
+
 layout = Layout()
 dash_app = DashProxy(
     __name__,
@@ -47,36 +71,143 @@ dash_app.index_string = """
         </footer>
     </body>
 </html>
-""".format(
-    settings.gtag, settings.gtag
-)
+""".format(settings.gtag, settings.gtag)
 
 dash_app.title = settings.title
 
 app = FastAPI(title="Stock Market Visualizer")
+
+dash_prefix = dash_app.config.routes_pathname_prefix
+app.add_middleware(
+    CompressionMiddleware,
+    paths=[
+        f"{dash_prefix}_dash-update-component",
+        f"{dash_prefix}_dash-layout",
+        f"{dash_prefix}{dash_app.config.assets_url_path}/",
+        f"{dash_prefix}_dash-component-suites/",
+    ],
+    minimum_size=settings.compression_minimum_size,
+)
+app.add_middleware(
+    ImmutableAssetMiddleware,
+    assets_path=f"{dash_prefix}{dash_app.config.assets_url_path}/",
+    component_suites_path=f"{dash_prefix}_dash-component-suites/",
+)
+
+
+@app.get("/stats/engine-result-cache")
+async def get_engine_result_cache_stats():
+    return app.state.engine_result_cache.get_stats()
+
+
+@app.get("/stats/engine-snapshots")
+async def get_engine_snapshot_stats():
+    return app.state.engine_api.snapshots.get_stats()
+
+
+@app.get("/stats/figure-cache")
+async def get_figure_cache_stats():
+    return app.state.figure_cache.get_stats()
+
+
+@app.get("/stats/render-pool")
+async def get_render_pool_stats():
+    if app.state.render_pool is None:
+        return {}
+    return app.state.render_pool.get_stats()
+
+
 app.mount("", WSGIMiddleware(dash_app.server))
 
 
+def create_shared_cache_tier(backend, storage, max_size, namespace):
+    """A cache tier shared by the workers, in redis or in the sqlite storage"""
+    if backend == "sqlite":
+        if not isinstance(storage, SqliteStorage):
+            storage = SqliteStorage(settings.storage_path)
+        return SqliteCacheTier(storage, max_size, namespace)
+    return RedisCacheTier(init_redis_pool(decode_responses=False), max_size, namespace)
+
+
+def create_engine_result_cache(storage):
+    if settings.engine_result_cache_backend == "memory":
+        tier = InProcessCacheTier(settings.engine_result_cache_size)
+    else:
+        tier = create_shared_cache_tier(
+            settings.engine_result_cache_backend,
+            storage,
+            settings.engine_result_cache_size,
+            "engine-result",
+        )
+    return EngineResultCache(tier)
+
+
+def create_figure_cache(storage):
+    tiers = [InProcessCacheTier(settings.figure_cache_size)]
+    backend = settings.figure_cache_backend
+    if backend is None:
+        backend = "redis" if settings.figure_cache_redis else "memory"
+    if backend != "memory":
+        tiers.append(
+            create_shared_cache_tier(
+                backend, storage, settings.figure_cache_size, "figure"
+            )
+        )
+    return FigureCache(tiers)
+
+
+def create_render_pool():
+    if settings.render_processes == 0:
+        return None
+    return RenderPool(settings.render_processes, settings.render_queue_depth)
+
+
 @app.on_event("startup")
 async def startup_event():
-    app.state.http_client = requests_cache.CachedSession(
-        backend=requests_cache.backends.RedisCache(
-            host=settings.redis_url, port=settings.redis_port, db=settings.redis_db
-        ),
-        allowable_methods=["GET", "POST"],
-        allowable_codes=[200, 203, 204, 300, 301, 308],
+    app.state.http_client = httpx.Client(timeout=None)
+    app.state.async_http_client = httpx.AsyncClient(timeout=None)
+    app.state.storage = create_storage(settings)
+    app.state.engine_result_cache = create_engine_result_cache(app.state.storage)
+    app.state.figure_cache = create_figure_cache(app.state.storage)
+    app.state.render_pool = create_render_pool()
+    app.state.async_engine_api = AsyncStockMarketEngineApi(
+        settings.api_url,
+        settings.api_port,
+        app.state.async_http_client,
+        settings.max_concurrent_api_requests,
+        asyncio.get_running_loop(),
+        app.state.engine_result_cache,
     )
-    app.state.redis = init_redis_pool()
     app.state.engine_api = StockMarketEngineApi(
-        settings.api_url, settings.api_port, app.state.http_client
+        settings.api_url,
+        settings.api_port,
+        app.state.http_client,
+        app.state.async_engine_api,
+    )
+    app.state.default_config_task = asyncio.create_task(
+        DefaultConfigRefresher(app.state.engine_api, app.state.storage, settings).run()
+    )
+    app.state.engine_scheduler_task = asyncio.create_task(
+        EngineScheduler(app.state.engine_api, app.state.storage, settings).run()
     )
     dash_app.layout = layout.get_layout()
-    layout.register_callbacks(dash_app, app.state.engine_api, app.state.redis)
+    layout.register_callbacks(
+        dash_app,
+        app.state.engine_api,
+        app.state.storage,
+        app.state.figure_cache,
+        app.state.render_pool,
+    )
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    app.state.default_config_task.cancel()
+    app.state.engine_scheduler_task.cancel()
     app.state.http_client.close()
+    await app.state.async_http_client.aclose()
+    if app.state.render_pool is not None:
+        app.state.render_pool.shutdown()
 
 
 if __name__ == "__main__":
@@ -7,13 +7,13 @@ logger = get_logger(__name__)
 global_settings = Settings()
 
 
-def init_redis_pool():
+def init_redis_pool(decode_responses=True):
     r = redis.from_url(
         url="redis://" + global_settings.redis_url,
         port=global_settings.redis_port,
         encoding="utf-8",
         db=global_settings.redis_db,
-        decode_responses=True,
+        decode_responses=decode_responses,
     )
     logger.info("Initialized sync redis")
     return r
@@ -0,0 +1,64 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from simputils.logging import get_logger
+
+from stock_market_visualizer.app.graph_renderer import GraphRenderer
+
+logger = get_logger(__name__)
+
+# The renderer of a pool process, it keeps its indicator cache between renders
+renderer = None
+
+
+def render(closes, signals, indicator_configs):
+    global renderer
+    if renderer is None:
+        renderer = GraphRenderer()
+    return renderer.get_traces_and_layout(closes, signals, indicator_configs)
+
+
+class RenderPool:
+    """
+    Renders figures in a pool of processes, so rendering does not hold the GIL of the
+    server process. The closes are handed over as numpy arrays, which pickle as their
+    raw bytes.
+
+    At most 'size' figures render at once and 'queue_depth' more wait for a process.
+    Renders beyond that are refused, so a burst of heavy figures cannot pile up.
+    """
+
+    def __init__(self, size, queue_depth):
+        # Forking a process with running threads and event loops is unsafe
+        self.executor = ProcessPoolExecutor(
+            size, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.slots = threading.BoundedSemaphore(size + queue_depth)
+        self.rendered = 0
+        self.refused = 0
+        self.lock = threading.Lock()
+
+    def render(self, closes, signals, indicator_configs):
+        """Returns the figure, its traces and the full resolution lines, or None if
+        the pool is saturated"""
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.refused += 1
+            logger.warning("The render pool is saturated, the figure is not updated")
+            return None
+        try:
+            result = self.executor.submit(
+                render, closes, signals, indicator_configs
+            ).result()
+        finally:
+            self.slots.release()
+        with self.lock:
+            self.rendered += 1
+        return result
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    def get_stats(self):
+        return {"rendered": self.rendered, "refused": self.refused}
@@ -1,15 +1,14 @@
-import json
-
 import dash
 from dash import dcc
 from dash_extensions.enrich import Input, Output, State
 from httpx import URL
 
 from stock_market_visualizer.app.config import get_settings
-from stock_market_visualizer.app.config_store import (
-    ConfigStore,
-    configure_default_configs,
+from stock_market_visualizer.app.config_store import ConfigStore
+from stock_market_visualizer.app.default_config_refresher import (
+    DefaultConfigRefresher,
 )
+from stock_market_visualizer.app.engine_scheduler import EngineScheduler
 
 
 class RestoreableStateLayout:
@@ -28,13 +27,14 @@ class RestoreableStateLayout:
     def get_layout(self):
         return [self.location, self.restoreable_state]
 
-    def register_callbacks(self, app, api, redis):
+    def register_callbacks(self, app, api, storage):
         @app.callback(Output(*self.get_restoreable_state()), Input(*self.get_url()))
         def update_state_from_url(url):
             url_splitted = URL(url).path.split("/engine/")
             if len(url_splitted) < 2:
-                configure_default_configs(api, redis, get_settings())
-                return ConfigStore(redis).get(ConfigStore.DEFAULT_VIEW_CONFIG_KEY)
+                return DefaultConfigRefresher(
+                    api, storage, get_settings()
+                ).get_view_config_id()
             return url_splitted[1]
 
         @app.callback(
@@ -49,11 +49,12 @@ class RestoreableStateLayout:
             Input(*self.get_restoreable_state()),
         )
         def update_from_state(state_id):
-            state_json = redis.get(state_id)
-            if state_json is None:
+            # The view is recorded in the same request as the state is read
+            batch = storage.batch()
+            EngineScheduler(api, storage, get_settings()).track_state(state_id, batch)
+            state = ConfigStore(storage).load_state(state_id, batch)
+            if state is None:
                 state = {}
-            else:
-                state = json.loads(state_json)
             keys = [
                 "header-title",
                 "engine-id",
@@ -96,7 +97,7 @@ class RestoreableStateLayout:
         ):
             if n_clicks == 0:
                 return dash.no_update
-            state_id = ConfigStore(redis).store_state(
+            state_id = ConfigStore(storage).store_state(
                 header_title,
                 engine_id,
                 start_date,
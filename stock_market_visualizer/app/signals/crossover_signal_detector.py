@@ -21,6 +21,7 @@ from stock_market_visualizer.app.signals.ticker_signal_detector import (
     TickerDetectorHandler,
     TickerDropdownLayout,
 )
+from stock_market_visualizer.common.clientside import clientside_callback
 from stock_market_visualizer.common.dropdown_button import DropdownButton
 
 logger = get_logger(__name__)
@@ -115,16 +116,18 @@ class CrossoverDetectorHandler(TickerDetectorHandler):
                     crossover_layout.unresponsive_getter,
                 )
 
-        @app.callback(
+        @clientside_callback(
+            app,
             Input(*crossover_layout.custom_name_layout.get_name()),
             State(*crossover_layout.signal_data_placeholder_layout.get_data()),
             Output(*crossover_layout.signal_data_placeholder_layout.get_data()),
         )
-        def update_custom_name(custom_name, data):
+        def update_crossover_name(custom_name, data):
             data["crossover_name"] = custom_name
             return data
 
-        @app.callback(
+        @clientside_callback(
+            app,
             Input(*crossover_layout.sentiment_dropdown_layout.get_sentiment()),
             State(*crossover_layout.signal_data_placeholder_layout.get_data()),
             Output(*crossover_layout.signal_data_placeholder_layout.get_data()),
@@ -25,6 +25,7 @@ from stock_market_visualizer.app.signals.common import (
 )
 from stock_market_visualizer.app.signals.cyto_graph import CytoGraph
 from stock_market_visualizer.common.button import Button
+from stock_market_visualizer.common.clientside import clientside_callback
 from stock_market_visualizer.common.dropdown_button import DropdownButton
 
 GRAY_COLOR = "#999999"
@@ -196,7 +197,8 @@ class GraphDetectorHandler:
 
             return data, 0
 
-        @app.callback(
+        @clientside_callback(
+            app,
             Input(self.__layout.signal_table.table_id, "active_cell"),
             Input(*self.__layout.graph.get_selected_nodes()),
             Input(*self.__layout.graph.get_selected_edges()),
@@ -224,26 +226,29 @@ class GraphDetectorHandler:
                 not enabled,
             )
 
-        @app.callback(
+        @clientside_callback(
+            app,
             Input(*self.__layout.graph.get_selected_nodes()),
             Output(*self.__layout.add_node_type_dropdown_button.get_disabled()),
         )
         def enable_add_signal(selected_nodes):
             return selected_nodes is None or len(selected_nodes) == 0
 
-        @app.callback(
+        @clientside_callback(
+            app,
             Input(*self.__layout.signal_data_placeholder_layout.get_data()),
             Output(*self.__layout.graph.get_elements()),
         )
         def sync_graph_data(data):
             return data.get("graph", [])
 
-        @app.callback(
+        @clientside_callback(
+            app,
             Input(*self.__layout.custom_name_layout.get_name()),
             State(*self.__layout.signal_data_placeholder_layout.get_data()),
             Output(*self.__layout.signal_data_placeholder_layout.get_data()),
         )
-        def update_custom_name(custom_name, data):
+        def update_signal_name(custom_name, data):
             data["signal_name"] = custom_name
             return data
 
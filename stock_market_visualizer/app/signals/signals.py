@@ -123,8 +123,8 @@ class SignalDetectorLayout:
             Input(*self.engine_layout.get_id()),
         )
         def update_signal_table(engine_id):
-            engine = engine_api.get_engine(engine_id)
-            if engine is None:
+            snapshot = engine_api.get_snapshot(engine_id)
+            if snapshot is None:
                 return dash.no_update
             return [
                 {
@@ -132,7 +132,7 @@ class SignalDetectorLayout:
                     "name": signal_detector["static_name"],
                     "config": json.dumps(signal_detector["config"]),
                 }
-                for signal_detector in engine.get_signal_detectors()
+                for signal_detector in snapshot.signal_detectors
             ]
 
         @app.callback(
@@ -74,10 +74,10 @@ class TickerDetectorHandler:
         return self.__engine_api
 
     def __get_options(self, engine_id):
-        engine = self.api().get_engine(engine_id)
-        if engine is None:
+        snapshot = self.api().get_snapshot(engine_id)
+        if snapshot is None:
             return []
-        return [{"label": t, "value": t} for t in engine.get_tickers()]
+        return [{"label": t, "value": t} for t in snapshot.tickers]
 
     def activate(self, engine_id, data):
         return engine_id, data
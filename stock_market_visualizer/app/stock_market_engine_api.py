@@ -1,16 +1,34 @@
+import asyncio
 import datetime
+import functools
 import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from http import HTTPStatus
 
 import backoff
 import httpx
+import msgpack
+import numpy as np
 from lru import LRU
 from simputils.logging import get_logger
 from stock_market.core import SignalSequence
 
+from stock_market_visualizer.app.columnar_ohlc import (
+    ACCEPT_HEADERS,
+    MSGPACK_CONTENT_TYPE,
+    ColumnarOHLC,
+)
 from stock_market_visualizer.app.config import get_settings
 
 MAX_CACHE_SIZE = get_settings().max_api_endpoint_cache_size
+MAX_ENGINE_SNAPSHOTS = get_settings().max_engine_snapshots
+# The fetch counts are kept for more engines than the snapshots, so the engines whose
+# snapshot is fetched again after its eviction show up
+MAX_FETCH_COUNTS = 1024
 logger = get_logger(__name__)
 
 
@@ -26,35 +44,388 @@ def get_create_engine_json(start_date, tickers, signal_detectors):
     )
 
 
+def get_ticker_ohlc_params(start_date):
+    """Only the bars at or after the start date are requested. The last bar that is
+    already known is requested again, as it might have changed during the day."""
+    if start_date is None:
+        return {}
+    return {"start_date": str(start_date)}
+
+
+def is_ok_response(response, request):
+    code = response.status_code
+    if code != HTTPStatus.OK:
+        if code >= 400:
+            logger.warning(
+                f"Encountered error code '{code}' for request '{request}'."
+                f" Response: {response.text[:500]}"
+            )
+        return False
+    return True
+
+
+def get_json_response(response, request):
+    if not is_ok_response(response, request):
+        return None
+    return response.json()
+
+
+def get_content_response(response, request):
+    """Decodes the response according to its content type, which is either msgpack or
+    json"""
+    if not is_ok_response(response, request):
+        return None
+    content_type = response.headers.get("content-type", "")
+    if content_type.startswith(MSGPACK_CONTENT_TYPE):
+        return msgpack.unpackb(response.content)
+    return response.json()
+
+
 class HttpRequester:
     def __init__(self, base_url, http_client):
         self.base_url = base_url
         self.http_client = http_client
 
     @backoff.on_exception(backoff.expo, (httpx.ConnectError))
-    def request_json(self, **kwargs):
+    def __request(self, get_response, **kwargs):
         kwargs_dict = dict(kwargs)
         kwargs_dict["url"] = self.base_url + kwargs_dict.pop("url")
 
         response = self.http_client.request(**kwargs_dict)
-        code = response.status_code
-        if code != HTTPStatus.OK:
-            if code >= 400:
-                logger.warning(
-                    f"Encountered error code '{code}' for request '{kwargs_dict}'."
-                    f" Response: {response.text[:500]}"
-                )
+        return get_response(response, kwargs_dict)
+
+    def request_json(self, **kwargs):
+        return self.__request(get_json_response, **kwargs)
+
+    def request_content(self, **kwargs):
+        return self.__request(get_content_response, **kwargs)
+
+
+class AsyncHttpRequester:
+    """Asyncio counterpart of the HttpRequester. At most 'max_concurrent_requests'
+    requests are in flight at the same time."""
+
+    def __init__(self, base_url, http_client, max_concurrent_requests):
+        self.base_url = base_url
+        self.http_client = http_client
+        self.semaphore = asyncio.Semaphore(max_concurrent_requests)
+
+    @backoff.on_exception(backoff.expo, (httpx.ConnectError))
+    async def __request(self, get_response, **kwargs):
+        kwargs_dict = dict(kwargs)
+        kwargs_dict["url"] = self.base_url + kwargs_dict.pop("url")
+
+        async with self.semaphore:
+            response = await self.http_client.request(**kwargs_dict)
+        return get_response(response, kwargs_dict)
+
+    async def request_json(self, **kwargs):
+        return await self.__request(get_json_response, **kwargs)
+
+    async def request_content(self, **kwargs):
+        return await self.__request(get_content_response, **kwargs)
+
+
+class InProcessCacheTier:
+    """Least recently used cache in the memory of this process, bounded by the pickled
+    size of its values."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value):
+        """Returns the number of evicted entries"""
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_size:
+            return 0
+
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.size += size
+
+            evicted = 0
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                evicted += 1
+            return evicted
+
+
+class RedisCacheTier:
+    """Least recently used cache in redis, bounded by the pickled size of its values.
+    The cache is shared by all workers connected to the same redis. The redis client
+    may not decode responses."""
+
+    def __init__(self, redis, max_size, namespace="engine-result"):
+        self.redis = redis
+        self.max_size = max_size
+        self.key_prefix = f"{namespace}:"
+        self.lru_key = f"{namespace}-lru"
+        self.sizes_key = f"{namespace}-sizes"
+        self.total_size_key = f"{namespace}-size"
+
+    def __len__(self):
+        return self.redis.zcard(self.lru_key)
+
+    @property
+    def size(self):
+        return int(self.redis.get(self.total_size_key) or 0)
+
+    def __get_redis_key(self, key):
+        return self.key_prefix + "/".join(map(str, key))
+
+    def get(self, key):
+        redis_key = self.__get_redis_key(key)
+        value = self.redis.get(redis_key)
+        if value is None:
             return None
-        response = response.json()
-        return response
+        self.redis.zadd(self.lru_key, {redis_key: time.time()}, xx=True)
+        return pickle.loads(value)
+
+    def set(self, key, value):
+        """Returns the number of evicted entries"""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_size:
+            return 0
+
+        redis_key = self.__get_redis_key(key)
+        previous_size = int(self.redis.hget(self.sizes_key, redis_key) or 0)
+        with self.redis.pipeline() as pipe:
+            pipe.set(redis_key, data)
+            pipe.zadd(self.lru_key, {redis_key: time.time()})
+            pipe.hset(self.sizes_key, redis_key, len(data))
+            pipe.incrby(self.total_size_key, len(data) - previous_size)
+            pipe.execute()
+
+        evicted = 0
+        while self.size > self.max_size:
+            popped = self.redis.zpopmin(self.lru_key)
+            if not popped:
+                break
+            evicted_key = popped[0][0]
+            evicted_size = int(self.redis.hget(self.sizes_key, evicted_key) or 0)
+            with self.redis.pipeline() as pipe:
+                pipe.delete(evicted_key)
+                pipe.hdel(self.sizes_key, evicted_key)
+                pipe.decrby(self.total_size_key, evicted_size)
+                pipe.execute()
+            evicted += 1
+        return evicted
+
+
+class SqliteCacheTier:
+    """Least recently used cache in a sqlite storage, bounded by the pickled size of
+    its values. The cache is shared by all workers using the same database file."""
+
+    def __init__(self, storage, max_size, namespace="engine-result"):
+        self.storage = storage
+        self.max_size = max_size
+        self.namespace = namespace
+        with self.storage.transaction() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache (namespace TEXT, key TEXT,"
+                " value BLOB, size INTEGER, used_at REAL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    def __len__(self):
+        return (
+            self.storage.connection()
+            .execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            )
+            .fetchone()[0]
+        )
 
+    @property
+    def size(self):
+        return (
+            self.storage.connection()
+            .execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache WHERE namespace = ?",
+                (self.namespace,),
+            )
+            .fetchone()[0]
+        )
 
-class StockEngineProxy:
-    def __init__(self, engine_id, engine_api):
+    def __get_sqlite_key(self, key):
+        return "/".join(map(str, key))
+
+    def get(self, key):
+        sqlite_key = self.__get_sqlite_key(key)
+        connection = self.storage.connection()
+        row = connection.execute(
+            "SELECT value FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, sqlite_key),
+        ).fetchone()
+        if row is None:
+            return None
+        connection.execute(
+            "UPDATE cache SET used_at = ? WHERE namespace = ? AND key = ?",
+            (time.time(), self.namespace, sqlite_key),
+        )
+        return pickle.loads(row[0])
+
+    def set(self, key, value):
+        """Returns the number of evicted entries"""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_size:
+            return 0
+
+        with self.storage.transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (
+                    self.namespace,
+                    self.__get_sqlite_key(key),
+                    data,
+                    len(data),
+                    time.time(),
+                ),
+            )
+            # Evicts the least recently used entries beyond the maximum size
+            return connection.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                " SELECT key FROM ("
+                "  SELECT key, SUM(size) OVER (ORDER BY used_at DESC) AS total"
+                "  FROM cache WHERE namespace = ?)"
+                " WHERE total > ?)",
+                (self.namespace, self.namespace, self.max_size),
+            ).rowcount
+
+
+class EngineResultCache:
+    """Caches the parsed results of engine reads per (engine id, endpoint). Every
+    mutation of an engine results in a new engine id, so the results of a given engine
+    id never change and entries stay valid until they are evicted."""
+
+    def __init__(self, tier):
+        self.tier = tier
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, engine_id, endpoint):
+        value = self.tier.get((engine_id, *endpoint))
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, engine_id, endpoint, value):
+        evicted = self.tier.set((engine_id, *endpoint), value)
+        with self.lock:
+            self.evictions += evicted
+
+    def set_predecessor(self, engine_id, predecessor_id, date):
+        """Records that the engine was created by updating the predecessor engine to
+        the given date"""
+        self.set(engine_id, ("predecessor",), (predecessor_id, date))
+
+    def set_origin(self, engine_id, origin_id, change):
+        """Records that the engine was created by applying the change, a tuple of the
+        operation and the ticker, to the origin engine"""
+        self.set(engine_id, ("origin",), (origin_id, change))
+
+    def get_origin(self, engine_id):
+        return self.tier.get((engine_id, "origin"))
+
+    def get_inherited_ohlc(self, engine_id, ticker):
+        """Returns the cached ticker ohlc of the closest origin of the engine, if the
+        engines in between only added or removed other tickers. None otherwise."""
+        while True:
+            origin = self.get_origin(engine_id)
+            if origin is None:
+                return None
+            engine_id, (_, changed_ticker) = origin
+            if changed_ticker == ticker:
+                return None
+            ohlc = self.tier.get((engine_id, "ticker", ticker))
+            if ohlc is not None:
+                return ohlc
+
+    def get_extendable_ohlc(self, engine_id, ticker):
+        """Returns the cached ticker ohlc of the predecessor of the engine, if the
+        engine only extends it to a later date. None otherwise."""
+        predecessor = self.tier.get((engine_id, "predecessor"))
+        if predecessor is None:
+            return None
+        predecessor_id, date = predecessor
+        ohlc = self.tier.get((predecessor_id, "ticker", ticker))
+        if ohlc is None or len(ohlc) == 0 or ohlc.end >= date:
+            return None
+        return ohlc
+
+    def get_stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.tier),
+            "size": self.tier.size,
+        }
+
+
+def cached_engine_result(endpoint):
+    """Caches the result of an engine proxy read in the result cache of its api. Only
+    idempotent reads can be cached. A None result means the request failed and is not
+    cached."""
+
+    def decorator(read):
+        if asyncio.iscoroutinefunction(read):
+
+            @functools.wraps(read)
+            async def async_wrapper(self, *args):
+                cache = self.engine_api.result_cache
+                key = (endpoint, *args)
+                result = await asyncio.to_thread(cache.get, self.engine_id, key)
+                if result is None:
+                    result = await read(self, *args)
+                    if result is not None:
+                        await asyncio.to_thread(cache.set, self.engine_id, key, result)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(read)
+        def wrapper(self, *args):
+            cache = self.engine_api.result_cache
+            key = (endpoint, *args)
+            result = cache.get(self.engine_id, key)
+            if result is None:
+                result = read(self, *args)
+                if result is not None:
+                    cache.set(self.engine_id, key, result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+class StockEnginePaths:
+    def __init__(self, engine_id):
         assert engine_id is not None
         self.engine_id = engine_id
-        self.engine_api = engine_api
-        self.engine_api._store_engine(self)
 
     def get_date_path(self):
         return f"/getdate/{self.engine_id}"
@@ -89,6 +460,13 @@ class StockEngineProxy:
     def get_signals_path(self):
         return f"/signals/{self.engine_id}"
 
+
+class StockEngineProxy(StockEnginePaths):
+    def __init__(self, engine_id, engine_api):
+        super().__init__(engine_id)
+        self.engine_api = engine_api
+        self.engine_api._store_engine(self)
+
     def create_engine_proxy(self, engine_id):
         return StockEngineProxy(engine_id, self.engine_api)
 
@@ -98,6 +476,7 @@ class StockEngineProxy:
             return self
         return self.create_engine_proxy(engine_id)
 
+    @cached_engine_result("start_date")
     def get_start_date(self):
         result = self.engine_api.http_requester.request_json(
             method="GET", url=self.get_start_date_path()
@@ -106,6 +485,7 @@ class StockEngineProxy:
             return None
         return datetime.date.fromisoformat(result)
 
+    @cached_engine_result("date")
     def get_date(self):
         result = self.engine_api.http_requester.request_json(
             method="GET", url=self.get_date_path()
@@ -122,38 +502,77 @@ class StockEngineProxy:
         )
         if engine_id is None:
             return self
+        self.engine_api.result_cache.set_predecessor(
+            engine_id, self.engine_id, np.datetime64(str(date), "D")
+        )
         return self.create_engine_proxy(engine_id)
 
-    def get_tickers(self):
-        result = self.engine_api.http_requester.request_json(
+    @cached_engine_result("tickers")
+    def __get_tickers(self):
+        return self.engine_api.http_requester.request_json(
             method="GET", url=self.get_tickers_path()
         )
+
+    def get_tickers(self):
+        result = self.__get_tickers()
         if result is None:
             return []
         return result
 
+    @cached_engine_result("ticker")
     def get_ticker_ohlc(self, ticker):
-        result = self.engine_api.http_requester.request_json(
-            method="GET", url=self.get_ticker_ohlc_path(ticker)
+        inherited = self.engine_api.result_cache.get_inherited_ohlc(
+            self.engine_id, ticker
         )
-        return result
+        if inherited is not None:
+            return inherited
+        previous = self.engine_api.result_cache.get_extendable_ohlc(
+            self.engine_id, ticker
+        )
+        if previous is not None:
+            delta = self.__get_ticker_ohlc(ticker, previous.end)
+            if delta is not None:
+                return previous.extend(delta)
+        return self.__get_ticker_ohlc(ticker)
+
+    def __get_ticker_ohlc(self, ticker, start_date=None):
+        result = self.engine_api.http_requester.request_content(
+            method="GET",
+            url=self.get_ticker_ohlc_path(ticker),
+            params=get_ticker_ohlc_params(start_date),
+            headers=ACCEPT_HEADERS,
+        )
+        if result is None:
+            return None
+        return ColumnarOHLC.from_content(result)
+
+    def __set_origin(self, engine_proxy, change):
+        if engine_proxy is not self:
+            self.engine_api.result_cache.set_origin(
+                engine_proxy.engine_id, self.engine_id, change
+            )
+        return engine_proxy
 
     def add_ticker(self, ticker):
         engine_proxy = self.perform_engine_operation(
             url=self.get_add_ticker_path(ticker)
         )
-        return engine_proxy
+        return self.__set_origin(engine_proxy, ("add_ticker", ticker))
 
     def remove_ticker(self, ticker):
         engine_proxy = self.perform_engine_operation(
             url=self.get_remove_ticker_path(ticker)
         )
-        return engine_proxy
+        return self.__set_origin(engine_proxy, ("remove_ticker", ticker))
 
-    def get_signal_detectors(self):
-        result = self.engine_api.http_requester.request_json(
+    @cached_engine_result("signal_detectors")
+    def __get_signal_detectors(self):
+        return self.engine_api.http_requester.request_json(
             method="GET", url=self.get_signal_detectors_path()
         )
+
+    def get_signal_detectors(self):
+        result = self.__get_signal_detectors()
         if result is None:
             return []
         return result
@@ -161,7 +580,7 @@ class StockEngineProxy:
     def add_signal_detector(self, signal_detector):
         engine_proxy = self.perform_engine_operation(
             url=self.add_signal_detector_path(),
-            data=json.dumps(signal_detector),
+            content=json.dumps(signal_detector),
         )
         return engine_proxy
 
@@ -171,26 +590,351 @@ class StockEngineProxy:
         )
         return engine_proxy
 
-    def get_signals(self):
+    @cached_engine_result("signals")
+    def __get_signals(self):
         result = self.engine_api.http_requester.request_json(
             method="GET",
             url=self.get_signals_path(),
         )
         if result is None:
-            return SignalSequence()
+            return None
         return SignalSequence.from_json(result)
 
+    def get_signals(self):
+        result = self.__get_signals()
+        if result is None:
+            return SignalSequence()
+        return result
+
+
+class AsyncStockEngineProxy(StockEnginePaths):
+    """Read-only asyncio counterpart of the StockEngineProxy."""
+
+    def __init__(self, engine_id, engine_api):
+        super().__init__(engine_id)
+        self.engine_api = engine_api
+
+    @cached_engine_result("start_date")
+    async def get_start_date(self):
+        result = await self.engine_api.http_requester.request_json(
+            method="GET", url=self.get_start_date_path()
+        )
+        if result is None:
+            return None
+        return datetime.date.fromisoformat(result)
+
+    @cached_engine_result("date")
+    async def get_date(self):
+        result = await self.engine_api.http_requester.request_json(
+            method="GET", url=self.get_date_path()
+        )
+        if result is None:
+            return None
+        return datetime.date.fromisoformat(result)
+
+    @cached_engine_result("tickers")
+    async def __get_tickers(self):
+        return await self.engine_api.http_requester.request_json(
+            method="GET", url=self.get_tickers_path()
+        )
+
+    async def get_tickers(self):
+        result = await self.__get_tickers()
+        if result is None:
+            return []
+        return result
+
+    @cached_engine_result("ticker")
+    async def get_ticker_ohlc(self, ticker):
+        inherited = await asyncio.to_thread(
+            self.engine_api.result_cache.get_inherited_ohlc, self.engine_id, ticker
+        )
+        if inherited is not None:
+            return inherited
+        previous = await asyncio.to_thread(
+            self.engine_api.result_cache.get_extendable_ohlc, self.engine_id, ticker
+        )
+        if previous is not None:
+            delta = await self.__get_ticker_ohlc(ticker, previous.end)
+            if delta is not None:
+                return previous.extend(delta)
+        return await self.__get_ticker_ohlc(ticker)
+
+    async def __get_ticker_ohlc(self, ticker, start_date=None):
+        result = await self.engine_api.http_requester.request_content(
+            method="GET",
+            url=self.get_ticker_ohlc_path(ticker),
+            params=get_ticker_ohlc_params(start_date),
+            headers=ACCEPT_HEADERS,
+        )
+        if result is None:
+            return None
+        # Parse outside of the event loop, the ohlc parsing is cpu bound
+        return await asyncio.to_thread(ColumnarOHLC.from_content, result)
+
+    async def get_snapshot_data(self):
+        """Reads the start date, the date, the tickers, the signal detectors, the
+        signals and the ticker ohlcs concurrently. The reads that failed are None,
+        the tickers whose ohlc failed are left out of the ohlcs."""
+
+        async def get_tickers_and_ohlcs():
+            tickers = await self.__get_tickers()
+            if tickers is None:
+                return None, {}
+            return tickers, await self.get_ticker_ohlcs(tickers)
+
+        (
+            start_date,
+            end_date,
+            signal_detectors,
+            signals,
+            (tickers, ohlcs),
+        ) = await asyncio.gather(
+            self.get_start_date(),
+            self.get_date(),
+            self.__get_signal_detectors(),
+            self.__get_signals(),
+            get_tickers_and_ohlcs(),
+        )
+        return start_date, end_date, tickers, signal_detectors, signals, ohlcs
+
+    async def get_ticker_ohlcs(self, tickers=None):
+        """Fetches the ohlc of all given tickers concurrently, or of all tickers of the
+        engine if none are given. Tickers without data are left out."""
+        if tickers is None:
+            tickers = await self.get_tickers()
+        results = await asyncio.gather(
+            *[self.get_ticker_ohlc(ticker) for ticker in tickers]
+        )
+        return {
+            ticker: result
+            for ticker, result in zip(tickers, results)
+            if result is not None
+        }
+
+    @cached_engine_result("signal_detectors")
+    async def __get_signal_detectors(self):
+        return await self.engine_api.http_requester.request_json(
+            method="GET", url=self.get_signal_detectors_path()
+        )
+
+    async def get_signal_detectors(self):
+        result = await self.__get_signal_detectors()
+        if result is None:
+            return []
+        return result
+
+    @cached_engine_result("signals")
+    async def __get_signals(self):
+        result = await self.engine_api.http_requester.request_json(
+            method="GET",
+            url=self.get_signals_path(),
+        )
+        if result is None:
+            return None
+        return await asyncio.to_thread(SignalSequence.from_json, result)
+
+    async def get_signals(self):
+        result = await self.__get_signals()
+        if result is None:
+            return SignalSequence()
+        return result
+
+
+class EngineSnapshot:
+    """All data of an engine that is shown by the visualizer. Engines are immutable,
+    so a snapshot never goes stale for its engine id, unless some of its reads failed.
+    Such a snapshot is not complete and must not be cached."""
+
+    def __init__(
+        self,
+        engine_id,
+        start_date,
+        end_date,
+        tickers,
+        signal_detectors,
+        signals,
+        ohlcs,
+        complete=True,
+    ):
+        self.engine_id = engine_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.tickers = tickers
+        self.signal_detectors = signal_detectors
+        self.signals = signals
+        self.ohlcs = ohlcs
+        self.complete = complete
+
+    def covers(self, start_date, end_date):
+        if self.start_date is None or self.end_date is None:
+            return False
+        return self.start_date <= start_date and end_date <= self.end_date
+
+    def slice(self, start_date, end_date):
+        """Returns the snapshot restricted to the dates at or after the start date and
+        before the end date. The signals are not recomputed for the new start date,
+        signals depending on the history before it might differ."""
+        return EngineSnapshot(
+            self.engine_id,
+            start_date,
+            end_date,
+            self.tickers,
+            self.signal_detectors,
+            SignalSequence(
+                [s for s in self.signals.signals if start_date <= s.date < end_date]
+            ),
+            {
+                ticker: ohlc.slice(start_date, end_date)
+                for ticker, ohlc in self.ohlcs.items()
+            },
+            self.complete,
+        )
+
+    def without_ticker(self, engine_id, ticker):
+        """Returns the snapshot of the engine created by removing the ticker from this
+        engine. The signals of the ticker are left out, the others are kept."""
+        return EngineSnapshot(
+            engine_id,
+            self.start_date,
+            self.end_date,
+            [t for t in self.tickers if t != ticker],
+            self.signal_detectors,
+            SignalSequence(
+                [
+                    s
+                    for s in self.signals.signals
+                    if ticker not in [t.symbol for t in s.tickers]
+                ]
+            ),
+            {t: ohlc for t, ohlc in self.ohlcs.items() if t != ticker},
+            self.complete,
+        )
+
+    @staticmethod
+    async def fetch(engine):
+        data = await engine.get_snapshot_data()
+        start_date, end_date, tickers, signal_detectors, signals, ohlcs = data
+        complete = None not in data and len(ohlcs) == len(tickers)
+        return (
+            start_date,
+            end_date,
+            tickers or [],
+            signal_detectors or [],
+            signals or SignalSequence(),
+            ohlcs,
+            complete,
+        )
+
+    @staticmethod
+    def load(async_engine_api, engine_id):
+        data = async_engine_api.run(
+            EngineSnapshot.fetch(async_engine_api.get_engine(engine_id))
+        )
+        return EngineSnapshot(engine_id, *data)
+
+
+class EngineSnapshotStore:
+    """Loads each engine snapshot once and shares it between all callbacks asking for
+    it, including the ones asking while it is still being loaded. Snapshots with a
+    failed read are returned, but loaded again by the next callback."""
+
+    def __init__(self, async_engine_api, max_size):
+        self.async_engine_api = async_engine_api
+        self.snapshots = LRU(max_size)
+        self.loading = {}
+        self.hits = 0
+        self.shared = 0
+        self.fetches = 0
+        self.fetch_counts = LRU(MAX_FETCH_COUNTS)
+        self.lock = threading.Lock()
+
+    def get_fetch_count(self, engine_id):
+        return self.fetch_counts.get(engine_id, 0)
+
+    def get_stats(self):
+        with self.lock:
+            refetched = {
+                engine_id: count
+                for engine_id, count in self.fetch_counts.items()
+                if count > 1
+            }
+        return {
+            "hits": self.hits,
+            "shared": self.shared,
+            "fetches": self.fetches,
+            "entries": len(self.snapshots),
+            "refetched": refetched,
+        }
+
+    def __derive(self, engine_id):
+        """Derives the snapshot of an engine that removed a ticker from an engine with
+        a loaded snapshot, without any engine requests"""
+        origin = self.async_engine_api.result_cache.get_origin(engine_id)
+        if origin is None:
+            return None
+        origin_id, (operation, ticker) = origin
+        if operation != "remove_ticker":
+            return None
+        with self.lock:
+            origin_snapshot = self.snapshots.get(origin_id)
+        if origin_snapshot is None:
+            return None
+        return origin_snapshot.without_ticker(engine_id, ticker)
+
+    def get(self, engine_id):
+        with self.lock:
+            if engine_id in self.snapshots:
+                self.hits += 1
+                return self.snapshots[engine_id]
+            future = self.loading.get(engine_id)
+            is_loader = future is None
+            if is_loader:
+                future = Future()
+                self.loading[engine_id] = future
+                self.fetches += 1
+                self.fetch_counts[engine_id] = self.get_fetch_count(engine_id) + 1
+            else:
+                self.shared += 1
+
+        if not is_loader:
+            return future.result()
+
+        logger.debug(
+            f"Fetching snapshot of engine '{engine_id}'"
+            f" (fetch count: {self.get_fetch_count(engine_id)})"
+        )
+        snapshot = None
+        try:
+            snapshot = self.__derive(engine_id) or EngineSnapshot.load(
+                self.async_engine_api, engine_id
+            )
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.loading.pop(engine_id)
+                if snapshot is not None and snapshot.complete:
+                    self.snapshots[engine_id] = snapshot
+        if not snapshot.complete:
+            logger.warning(f"Reading the snapshot of engine '{engine_id}' failed")
+        future.set_result(snapshot)
+        return snapshot
+
 
 def concat_port(url, port):
     return url + ":" + str(port)
 
 
 class StockMarketEngineApi:
-    def __init__(self, api_url, api_port, http_client):
+    def __init__(self, api_url, api_port, http_client, async_engine_api):
         self.http_requester = HttpRequester(
             concat_port(api_url, port=api_port), http_client
         )
+        self.result_cache = async_engine_api.result_cache
         self.cache = LRU(MAX_CACHE_SIZE)
+        self.snapshots = EngineSnapshotStore(async_engine_api, MAX_ENGINE_SNAPSHOTS)
 
     def get_create_path(self):
         return "/create"
@@ -209,13 +953,18 @@ class StockMarketEngineApi:
             return self.cache[engine_id]
         return StockEngineProxy(engine_id, self)
 
+    def get_snapshot(self, engine_id):
+        if engine_id is None:
+            return None
+        return self.snapshots.get(engine_id)
+
     def create_engine(self, start_date, tickers, signal_detectors):
         data = get_create_engine_json(start_date, tickers, signal_detectors)
         return self.create_engine_from_json(data)
 
     def create_engine_from_json(self, json_config):
         result = self.http_requester.request_json(
-            method="POST", url=self.get_create_path(), data=json_config
+            method="POST", url=self.get_create_path(), content=json_config
         )
         return StockEngineProxy(result, self)
 
@@ -230,3 +979,32 @@ class StockMarketEngineApi:
             method="GET", url=self.get_supported_signal_detectors_path()
         )
         return result
+
+
+class AsyncStockMarketEngineApi:
+    """Asyncio counterpart of the StockMarketEngineApi. Requests are executed on
+    'loop', which allows the synchronous dash callbacks to fan out requests
+    concurrently through 'run'."""
+
+    def __init__(
+        self,
+        api_url,
+        api_port,
+        http_client,
+        max_concurrent_requests,
+        loop,
+        result_cache,
+    ):
+        self.http_requester = AsyncHttpRequester(
+            concat_port(api_url, port=api_port), http_client, max_concurrent_requests
+        )
+        self.loop = loop
+        self.result_cache = result_cache
+
+    def get_engine(self, engine_id):
+        return AsyncStockEngineProxy(engine_id, self)
+
+    def run(self, coroutine):
+        """Runs the coroutine on the event loop of the api and blocks until it is
+        done. Must not be called from within that event loop."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
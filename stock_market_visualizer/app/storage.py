@@ -0,0 +1,277 @@
+"""
+The storage of the restoreable states, the default view config and the scheduler. A
+storage has
+
+- get(key) and set(key, value, ttl=None) for bytes values, which expire ttl seconds
+  (or a timedelta) after they are set
+- set_scores(key, scores), remove_scores(key, members),
+  remove_scores_below(key, score) and get_highest_scores(key, count) for sets of
+  members with a score
+- lock(name, timeout, blocking_timeout=None), a lock shared by all workers using the
+  storage, which expires after timeout seconds
+- batch(), which sends get, set and set_scores operations to the storage together
+
+RedisStorage is shared by all replicas connected to the same redis. SqliteStorage is
+an embedded file, shared by the workers on the same machine.
+"""
+
+import datetime as dt
+import sqlite3
+import threading
+import time
+import uuid
+
+from redis.exceptions import LockError  # noqa: F401
+from simputils.logging import get_logger
+
+from stock_market_visualizer.app.redis_helper import init_redis_pool
+
+logger = get_logger(__name__)
+
+# Expired values are deleted from sqlite at most this often, reads skip them anyway
+PURGE_INTERVAL_SECONDS = 60 * 60
+LOCK_POLL_INTERVAL_SECONDS = 0.1
+
+
+def get_seconds(ttl):
+    if isinstance(ttl, dt.timedelta):
+        return ttl.total_seconds()
+    return ttl
+
+
+class Batch:
+    """Operations that are sent to the storage together by execute, which returns
+    their results in order"""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.operations = []
+
+    def get(self, key):
+        self.operations.append(("get", (key,)))
+
+    def set(self, key, value, ttl=None):
+        self.operations.append(("set", (key, value, ttl)))
+
+    def set_scores(self, key, scores):
+        self.operations.append(("set_scores", (key, scores)))
+
+    def execute(self):
+        return self.storage.execute_batch(self.operations)
+
+
+class RedisStorage:
+    """The redis client may not decode responses"""
+
+    def __init__(self, redis):
+        self.redis = redis
+
+    def get(self, key):
+        return self.redis.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.redis.set(key, value, ex=ttl)
+
+    def set_scores(self, key, scores):
+        self.redis.zadd(key, scores)
+
+    def remove_scores(self, key, members):
+        if members:
+            self.redis.zrem(key, *members)
+
+    def remove_scores_below(self, key, score):
+        self.redis.zremrangebyscore(key, "-inf", f"({score}")
+
+    def get_highest_scores(self, key, count):
+        return [
+            (member.decode(), score)
+            for member, score in self.redis.zrevrange(
+                key, 0, count - 1, withscores=True
+            )
+        ]
+
+    def lock(self, name, timeout, blocking_timeout=None):
+        return self.redis.lock(name, timeout=timeout, blocking_timeout=blocking_timeout)
+
+    def batch(self):
+        return Batch(self)
+
+    def execute_batch(self, operations):
+        # A transaction, so the operations are also applied together
+        with self.redis.pipeline() as pipeline:
+            storage = RedisStorage(pipeline)
+            for name, args in operations:
+                getattr(storage, name)(*args)
+            return pipeline.execute()
+
+
+class SqliteLock:
+    """A lock row in the storage, which other workers may take over once it
+    expired"""
+
+    def __init__(self, storage, name, timeout, blocking_timeout):
+        self.storage = storage
+        self.name = name
+        self.timeout = timeout
+        self.blocking_timeout = blocking_timeout
+        self.token = uuid.uuid4().hex
+
+    def __try_acquire(self):
+        now = time.time()
+        with self.storage.transaction() as connection:
+            connection.execute(
+                "DELETE FROM locks WHERE name = ? AND expires_at <= ?",
+                (self.name, now),
+            )
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO locks VALUES (?, ?, ?)",
+                (self.name, self.token, now + self.timeout),
+            )
+            return cursor.rowcount == 1
+
+    def acquire(self, blocking=True):
+        deadline = None
+        if self.blocking_timeout is not None:
+            deadline = time.monotonic() + self.blocking_timeout
+        while not self.__try_acquire():
+            if not blocking or (deadline is not None and time.monotonic() > deadline):
+                return False
+            time.sleep(LOCK_POLL_INTERVAL_SECONDS)
+        return True
+
+    def __enter__(self):
+        if self.acquire():
+            return self
+        raise LockError("Unable to acquire lock within the time specified")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def release(self):
+        cursor = self.storage.connection().execute(
+            "DELETE FROM locks WHERE name = ? AND token = ?", (self.name, self.token)
+        )
+        if cursor.rowcount == 0:
+            raise LockError("Cannot release a lock that is no longer owned")
+
+
+class SqliteTransaction:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        # Takes the write lock of the database right away, readers are not blocked
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class SqliteStorage:
+    """A sqlite database in write ahead log mode, so reads do not wait for writes.
+    Each thread has its own connection."""
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.purged_at = 0
+        with self.transaction() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries"
+                " (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS scores"
+                " (key TEXT, member TEXT, score REAL, PRIMARY KEY (key, member))"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS locks"
+                " (name TEXT PRIMARY KEY, token TEXT, expires_at REAL)"
+            )
+        logger.info(f"Initialized sqlite storage at {path}")
+
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            # Autocommit, transactions are explicit
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def transaction(self):
+        return SqliteTransaction(self.connection())
+
+    def get(self, key):
+        row = (
+            self.connection()
+            .execute(
+                "SELECT value FROM entries"
+                " WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return None if row is None else row[0]
+
+    def __purge_expired(self):
+        now = time.time()
+        if now - self.purged_at < PURGE_INTERVAL_SECONDS:
+            return
+        self.purged_at = now
+        self.connection().execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+
+    def set(self, key, value, ttl=None):
+        if isinstance(value, str):
+            value = value.encode()
+        expires_at = None if ttl is None else time.time() + get_seconds(ttl)
+        self.connection().execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (key, value, expires_at)
+        )
+        self.__purge_expired()
+
+    def set_scores(self, key, scores):
+        self.connection().executemany(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?)",
+            [(key, member, score) for member, score in scores.items()],
+        )
+
+    def remove_scores(self, key, members):
+        self.connection().executemany(
+            "DELETE FROM scores WHERE key = ? AND member = ?",
+            [(key, member) for member in members],
+        )
+
+    def remove_scores_below(self, key, score):
+        self.connection().execute(
+            "DELETE FROM scores WHERE key = ? AND score < ?", (key, score)
+        )
+
+    def get_highest_scores(self, key, count):
+        return (
+            self.connection()
+            .execute(
+                "SELECT member, score FROM scores WHERE key = ?"
+                " ORDER BY score DESC LIMIT ?",
+                (key, count),
+            )
+            .fetchall()
+        )
+
+    def lock(self, name, timeout, blocking_timeout=None):
+        return SqliteLock(self, name, timeout, blocking_timeout)
+
+    def batch(self):
+        return Batch(self)
+
+    def execute_batch(self, operations):
+        with self.transaction():
+            return [getattr(self, name)(*args) for name, args in operations]
+
+
+def create_storage(settings):
+    if settings.storage_backend == "sqlite":
+        return SqliteStorage(settings.storage_path)
+    return RedisStorage(init_redis_pool(decode_responses=False))
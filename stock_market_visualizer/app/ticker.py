@@ -3,6 +3,8 @@ import dash_bootstrap_components as dbc
 from dash import dash_table, dcc, html
 from dash_extensions.enrich import Input, Output, State
 
+from stock_market_visualizer.common.clientside import clientside_callback
+
 
 class TickerLayout:
     def __init__(self, engine_layout):
@@ -83,7 +85,8 @@ class TickerLayout:
         return self.layout
 
     def register_callbacks(self, app, engine_api):
-        @app.callback(
+        @clientside_callback(
+            app,
             Input(*self.get_show_ticker_table()),
             Output(self.collapse_ticker_table, "is_open"),
         )
@@ -94,12 +97,11 @@ class TickerLayout:
             Output(*self.get_ticker_table()), Input(*self.engine_layout.get_id())
         )
         def update_ticker_table(engine_id):
-            engine = engine_api.get_engine(engine_id)
-            if engine is None:
+            snapshot = engine_api.get_snapshot(engine_id)
+            if snapshot is None:
                 return dash.no_update
 
-            tickers = engine.get_tickers()
-            return [{"ticker-col": ticker} for ticker in tickers]
+            return [{"ticker-col": ticker} for ticker in snapshot.tickers]
 
         @app.callback(
             Output(*self.get_add_ticker_input_value()),
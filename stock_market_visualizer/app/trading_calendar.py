@@ -0,0 +1,47 @@
+from functools import cache
+
+import numpy as np
+
+from stock_market_visualizer.app.config import get_settings
+
+
+def load_holidays(path):
+    """Reads a holiday file with one iso date per line. Empty lines and lines starting
+    with '#' are skipped."""
+    with open(path) as f:
+        lines = [line.strip() for line in f]
+    return np.array(
+        [line for line in lines if line and not line.startswith("#")],
+        dtype="datetime64[D]",
+    )
+
+
+class TradingCalendar:
+    """The weekdays without the given holidays. Offsets are resolved with numpy on a
+    precomputed business day calendar, without materializing the dates in between."""
+
+    def __init__(self, holidays):
+        self.calendar = np.busdaycalendar(holidays=holidays)
+
+    def is_trading_day(self, dates):
+        return np.is_busday(
+            np.asarray(dates, dtype="datetime64[D]"), busdaycal=self.calendar
+        )
+
+    def offset(self, dates, days):
+        """Returns the trading days that lie 'days' trading days after the dates.
+        Dates that are not a trading day are first rolled forward to the next one."""
+        return np.busday_offset(
+            np.asarray(dates, dtype="datetime64[D]"),
+            days,
+            roll="forward",
+            busdaycal=self.calendar,
+        )
+
+
+@cache
+def get_trading_calendar():
+    holiday_file = get_settings().holiday_file
+    if holiday_file is None:
+        return TradingCalendar(np.array([], dtype="datetime64[D]"))
+    return TradingCalendar(load_holidays(holiday_file))
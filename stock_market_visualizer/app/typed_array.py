@@ -0,0 +1,36 @@
+import base64
+
+import numpy as np
+
+from stock_market_visualizer.app.columnar_ohlc import from_epoch_days, to_epoch_days
+
+# Line values are drawn, 7 significant digits are more than a graph can show
+VALUE_DTYPE = "f4"
+DATE_DTYPE = "i4"
+
+
+def encode(values, dtype):
+    """Encodes the values as a plotly typed array, the little endian bytes of the
+    values in base64"""
+    values = np.ascontiguousarray(values, dtype=f"<{dtype}")
+    return {"dtype": dtype, "bdata": base64.b64encode(values).decode("ascii")}
+
+
+def encode_values(values):
+    return encode(values, VALUE_DTYPE)
+
+
+def encode_dates(dates):
+    """Encodes the dates as days since the epoch. The unit is not part of the plotly
+    format, assets/typed_arrays.js turns the days into the milliseconds plotly uses
+    for dates."""
+    return {**encode(to_epoch_days(dates), DATE_DTYPE), "unit": "D"}
+
+
+def decode(typed_array):
+    values = np.frombuffer(
+        base64.b64decode(typed_array["bdata"]), dtype=f"<{typed_array['dtype']}"
+    )
+    if typed_array.get("unit") == "D":
+        return from_epoch_days(values)
+    return values
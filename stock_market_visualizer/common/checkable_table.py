@@ -2,6 +2,7 @@ import dash_bootstrap_components as dbc
 from dash import dash_table, dcc
 from dash_extensions.enrich import Input, Output
 
+from stock_market_visualizer.common.clientside import clientside_callback
 from stock_market_visualizer.common.dropdown_button import DropdownButton
 
 
@@ -61,8 +62,10 @@ class CheckableTableLayout:
         )
 
     def register_callbacks(self, app):
-        @app.callback(
-            Input(*self.get_show_table()), Output(self.collapse_table_id, "is_open")
+        @clientside_callback(
+            app,
+            Input(*self.get_show_table()),
+            Output(self.collapse_table_id, "is_open"),
         )
         def toggle_collapse_table(show_table):
             return True in show_table
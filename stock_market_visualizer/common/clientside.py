@@ -0,0 +1,23 @@
+from dash import ClientsideFunction
+
+NAMESPACE = "clientside"
+
+# The callbacks that are pure functions of their inputs, by their dependencies. Outputs
+# may be shared by several callbacks. They run in the browser, the javascript functions
+# with the same names are in app/assets/clientside.js and the python functions remain
+# as their reference.
+CLIENTSIDE_CALLBACKS = {}
+
+
+def clientside_callback(app, *dependencies):
+    """Like app.callback, but registers the javascript implementation of the
+    decorated pure callback instead"""
+
+    def register(function):
+        CLIENTSIDE_CALLBACKS[tuple(map(str, dependencies))] = function
+        app.clientside_callback(
+            ClientsideFunction(NAMESPACE, function.__name__), *dependencies
+        )
+        return function
+
+    return register
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from stock_market.core import TimeSeries
+from stock_market.ext.indicator import ExponentialMovingAverage, Identity, MovingAverage
+
+from stock_market_visualizer.app.batched_indicators import evaluate_indicators
+
+NOF_TICKERS = 5
+NOF_DAYS = 300
+
+
+def create_requests(indicators):
+    """Requests of the indicators on several tickers. Every third ticker starts later,
+    so not all series share their dates, and some values are missing."""
+    dates = pd.bdate_range("2020-01-01", periods=NOF_DAYS)
+    dates = dates.to_numpy().astype("datetime64[D]")
+    rng = np.random.default_rng(0)
+    requests = []
+    for i in range(NOF_TICKERS):
+        start = (i % 3 == 2) * NOF_DAYS // 3
+        values = 100 + rng.standard_normal(NOF_DAYS).cumsum()
+        values[rng.integers(0, NOF_DAYS, 10)] = np.nan
+        requests.extend(
+            (indicator, f"T{i}", dates[start:], values[start:])
+            for indicator in indicators
+        )
+    return requests
+
+
+def evaluate_separately(indicator, name, dates, values):
+    return indicator(
+        TimeSeries(name, pd.DataFrame({"date": dates, "value": values}))
+    ).values.to_numpy()
+
+
+@pytest.mark.parametrize(
+    "indicators",
+    [
+        [MovingAverage(period) for period in [1, 5, 50, 200]],
+        [ExponentialMovingAverage(period) for period in [1, 5, 20, 200]],
+        [Identity()],
+        [MovingAverage(20), ExponentialMovingAverage(20), Identity()],
+    ],
+)
+def test_batched_values_equal_separate_values(indicators):
+    requests = create_requests(indicators)
+    batched = evaluate_indicators(requests)
+    assert len(batched) == len(requests)
+    for request, values in zip(requests, batched):
+        np.testing.assert_array_equal(values, evaluate_separately(*request))
@@ -0,0 +1,45 @@
+import re
+import types
+from pathlib import Path
+
+import pytest
+from dash_extensions.enrich import DashProxy, MultiplexerTransform
+
+from stock_market_visualizer.app.layout import Layout
+from stock_market_visualizer.common.clientside import CLIENTSIDE_CALLBACKS
+
+CLIENTSIDE_JS = (
+    Path(__file__).parents[1] / "stock_market_visualizer/app/assets/clientside.js"
+)
+
+
+@pytest.fixture(scope="module")
+def registered_callbacks():
+    engine_api = types.SimpleNamespace(
+        get_supported_signal_detectors=lambda: [],
+        get_supported_indicators=lambda: [],
+    )
+    app = DashProxy(transforms=[MultiplexerTransform()])
+    layout = Layout()
+    app.layout = layout.get_layout()
+    layout.register_callbacks(app, engine_api, None, None, None)
+    return CLIENTSIDE_CALLBACKS
+
+
+def get_javascript_functions():
+    return set(re.findall(r"^\s+(\w+): function", CLIENTSIDE_JS.read_text(), re.M))
+
+
+def test_registered_callbacks_are_implemented_in_javascript(registered_callbacks):
+    names = {function.__name__ for function in registered_callbacks.values()}
+    assert names
+    assert names == get_javascript_functions()
+
+
+def test_callbacks_with_the_same_name_are_all_registered(registered_callbacks):
+    toggles = [
+        dependencies
+        for dependencies, function in registered_callbacks.items()
+        if function.__name__ == "toggle_collapse_table"
+    ]
+    assert len(toggles) > 1
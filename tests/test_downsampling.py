@@ -0,0 +1,49 @@
+import time
+
+import numpy as np
+import pytest
+
+from stock_market_visualizer.app.downsampling import downsample, get_envelope_indices
+
+MAX_POINTS = 1920
+
+
+def create_values(nof_points):
+    return 100 + np.random.default_rng(0).standard_normal(nof_points).cumsum()
+
+
+@pytest.mark.parametrize("nof_points", [1921, 2500, 7000, 100000])
+def test_envelope_keeps_the_extremes(nof_points):
+    values = create_values(nof_points)
+    indices = get_envelope_indices(values, MAX_POINTS)
+    assert len(indices) <= MAX_POINTS
+    assert indices[0] == 0
+    assert indices[-1] == nof_points - 1
+    assert np.all(np.diff(indices) > 0)
+    assert values.argmin() in indices
+    assert values.argmax() in indices
+
+
+def test_short_lines_are_kept():
+    values = create_values(MAX_POINTS)
+    np.testing.assert_array_equal(
+        get_envelope_indices(values, MAX_POINTS), np.arange(MAX_POINTS)
+    )
+
+
+def test_downsample_keeps_dates_and_values_together():
+    dates = np.arange(10000).astype("datetime64[D]")
+    values = create_values(10000)
+    downsampled_dates, downsampled_values = downsample(dates, values, MAX_POINTS)
+    indices = downsampled_dates.astype(np.int64)
+    np.testing.assert_array_equal(downsampled_values, values[indices])
+
+
+def test_downsampling_a_long_render_is_fast():
+    """The lines of 15 tickers with 3 indicators each over 28 years, downsampled to
+    the graph width, took seconds with a python loop per bucket"""
+    lines = [create_values(7000) for _ in range(15 * 4)]
+    start = time.perf_counter()
+    for values in lines:
+        get_envelope_indices(values, MAX_POINTS)
+    assert time.perf_counter() - start < 0.5
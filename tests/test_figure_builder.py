@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+import pytest
+
+from stock_market_visualizer.app.figure_builder import (
+    FigureBuilder,
+    GraphObjectsFigureBuilder,
+)
+from stock_market_visualizer.app.typed_array import decode
+
+NOF_POINTS = 100
+MARKER_STEP = 10
+
+
+def create_lines():
+    """A ticker line and two indicator lines of that ticker"""
+    dates = pd.bdate_range("2020-01-01", periods=NOF_POINTS).to_numpy("datetime64[D]")
+    rng = np.random.default_rng(0)
+    values = rng.standard_normal(NOF_POINTS).cumsum()
+    values[[3, 50]] = np.nan
+    return [
+        (["T", None, None], "T", dates, values),
+        (["T", "SMA", [5]], "SMA 5 T", dates, values + 1),
+        (["T", "EMA", [20]], "EMA 20 T", dates, values - 1),
+    ]
+
+
+def build(builder, line_type, relative, signal_row):
+    lines = create_lines()
+    builder.add_lines(lines, line_type)
+    if relative:
+        builder.set_relative()
+    _, name, dates, values = lines[0]
+    builder.add_markers(
+        f"Signal ({name})",
+        list(dates[::MARKER_STEP].astype(object)),
+        values[::MARKER_STEP],
+        dict(symbol="triangle-up", size=12, color="green"),
+    )
+    if signal_row:
+        builder.add_signal_row()
+        builder.add_markers(
+            "Monthly",
+            list(dates[::MARKER_STEP].astype(object)),
+            [0] * len(dates[::MARKER_STEP]),
+            dict(symbol="circle", color="gray"),
+            in_signal_row=True,
+        )
+    return json.loads(pio.to_json(builder.build(), validate=False))
+
+
+@pytest.mark.parametrize("line_type", ["scatter", "scattergl"])
+@pytest.mark.parametrize("relative", [False, True])
+@pytest.mark.parametrize("signal_row", [False, True])
+def test_figure_equals_graph_objects_figure(line_type, relative, signal_row):
+    expected = build(GraphObjectsFigureBuilder(), line_type, relative, signal_row)
+    figure = build(FigureBuilder(typed_arrays=False), line_type, relative, signal_row)
+    assert figure == expected
+
+
+@pytest.mark.parametrize("signal_row", [False, True])
+def test_typed_arrays_decode_to_the_lines(signal_row):
+    figure = build(FigureBuilder(), "scattergl", True, signal_row)
+    for trace, (line_id, name, dates, values) in zip(figure["data"], create_lines()):
+        assert trace["meta"] == line_id
+        assert trace["name"] == name
+        np.testing.assert_array_equal(decode(trace["x"]), dates)
+        np.testing.assert_array_equal(decode(trace["y"]), values.astype("f4"))
+    assert figure["layout"]["xaxis"]["type"] == "date"
+    assert figure["layout"]["yaxis"]["tickformat"] == ",.1%"
+    assert ("xaxis2" in figure["layout"]) == signal_row
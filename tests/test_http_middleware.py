@@ -0,0 +1,83 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from stock_market_visualizer.app import http_middleware
+from stock_market_visualizer.app.http_middleware import (
+    CompressionMiddleware,
+    get_encoding,
+)
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    # Only whether brotli is installed matters to the negotiation
+    monkeypatch.setattr(http_middleware, "brotli", object())
+
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(http_middleware, "brotli", None)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encoding",
+    [
+        ("br;q=0, gzip", "gzip"),
+        ("br, gzip", "br"),
+        ("gzip, br;q=0.5", "gzip"),
+        ("gzip;q=0.5, br;q=0.8", "br"),
+        ("GZIP;Q=0.1", "gzip"),
+        ("gzip;q=0, br;q=0", None),
+        ("*", "br"),
+        ("*;q=0", None),
+        ("br;q=0, *", "gzip"),
+        ("gzip;q=invalid", None),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_get_encoding_with_brotli(with_brotli, accept_encoding, encoding):
+    assert get_encoding(accept_encoding) == encoding
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encoding",
+    [("br, gzip", "gzip"), ("br", None), ("gzip;q=0", None), ("*", "gzip")],
+)
+def test_get_encoding_without_brotli(without_brotli, accept_encoding, encoding):
+    assert get_encoding(accept_encoding) == encoding
+
+
+def request(accept_encoding):
+    async def endpoint(request):
+        return JSONResponse({"values": list(range(1000))})
+
+    app = CompressionMiddleware(
+        Starlette(routes=[Route("/_dash-update", endpoint)]), ["/_dash"], 500
+    )
+
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.get(
+                "/_dash-update", headers={"accept-encoding": accept_encoding}
+            )
+
+    return asyncio.run(send())
+
+
+def test_compresses_the_accepted_encoding(without_brotli):
+    response = request("gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == {"values": list(range(1000))}
+
+
+def test_does_not_compress_an_unacceptable_encoding(without_brotli):
+    response = request("gzip;q=0")
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"values": list(range(1000))}